@@ -6,23 +6,29 @@ STLC adımlarına ait router’lar eklenir ve uygulama başlatılır.
 """
 
 import uvicorn
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List
 import os
+import sys
+import time
+import uuid
 import logging
+from contextlib import asynccontextmanager
 from io import BytesIO
 from fastapi.responses import JSONResponse
-from stlc.code_review import run_step as run_code_review
+from stlc.registry import PROCESS_ALIASES, get_handler, process_handler_map, parse_warmup_spec, warm_up
+from config import STLC_WARMUP_STEPS, STLC_ENV, GRACEFUL_TIMEOUT, JOB_STATE_TTL, ADMISSION_TRUSTED_PROXIES
+from core.admission import admission_controller, AdmissionRejected
+from core.shared_store import shared_store
+from utils.review_sources import SourceBudget, iter_upload_sources
 
 # Set up logging
 logger = logging.getLogger("app")
 logging.basicConfig(level=logging.INFO)
 
-# Define process handlers dictionary
-PROCESS_HANDLERS = {
-    'code-review': run_code_review  # Use hyphenated version to match frontend
-}
+# Define process handlers dictionary (hyphenated ids to match frontend, loaded on first use)
+PROCESS_HANDLERS = process_handler_map()
 
 app = FastAPI(
     title="STLC Manager Backend",
@@ -37,66 +43,128 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Job-Id", "Retry-After"],
 )
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+TRUSTED_PROXIES = {part.strip() for part in ADMISSION_TRUSTED_PROXIES.split(",") if part.strip()}
+
+def resolve_tenant(request: Request) -> str:
+    """
+    Adil kuyruklama için istek sahibini "kullanıcı/proje" olarak belirler.
+    X-User-Id / X-Project-Id başlıkları sadece ADMISSION_TRUSTED_PROXIES'teki ön uçlardan gelirse
+    kullanılır; aksi halde her istekte başlığı değiştiren bir istemci tenant sınırlarını aşabilirdi.
+    Diğer durumlarda tenant istemci IP adresidir.
+    """
+    client = request.client.host if request.client else "anonymous"
+    if "*" not in TRUSTED_PROXIES and client not in TRUSTED_PROXIES:
+        return f"{client}/default"
+    user = request.headers.get("X-User-Id") or client
+    project = request.headers.get("X-Project-Id") or "default"
+    return f"{user}/{project}"
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    logger.warning(str(exc))
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.on_event("startup")
+def warm_up_steps():
+    warm_up(parse_warmup_spec(STLC_WARMUP_STEPS))
+
+@app.on_event("startup")
+def purge_shared_store():
+    purged = shared_store.purge_expired()
+    if purged:
+        logger.info(f"Purged {purged} expired shared store entries")
+
+@app.on_event("shutdown")
+async def drain_model_calls():
+    if not await admission_controller.drain(timeout=GRACEFUL_TIMEOUT):
+        logger.warning("Shutdown drain timed out with model calls still in flight")
+
+@asynccontextmanager
+async def track_job(process_type: str, tenant: str, response: Response):
+    """
+    Süreç çalıştırmasını ortak depoda iş (job) olarak kaydeder; durum, isteği hangi worker
+    karşılarsa karşılasın /api/jobs/{job_id} üzerinden sorgulanabilir.
+    """
+    job_id = uuid.uuid4().hex
+    response.headers["X-Job-Id"] = job_id
+    shared_store.set("jobs", job_id, {
+        "process": process_type,
+        "tenant": tenant,
+        "status": "running",
+        "worker_pid": os.getpid(),
+        "started_at": time.time()
+    }, ttl=JOB_STATE_TTL)
+    try:
+        yield job_id
+    except Exception as e:
+        shared_store.update("jobs", job_id, {"status": "failed", "error": str(e), "finished_at": time.time()}, ttl=JOB_STATE_TTL)
+        raise
+    shared_store.update("jobs", job_id, {"status": "completed", "finished_at": time.time()}, ttl=JOB_STATE_TTL)
 
 @app.get("/")
 def read_root():
     return {"message": "STLC Manager Backend is running!"}
 
+@app.get("/api/admission/stats")
+def admission_stats():
+    return admission_controller.stats()
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    job = shared_store.get("jobs", job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
 @app.post("/api/processes/code_review/run")
-async def process_code_review(files: List[UploadFile] = File(...)):
+async def process_code_review(request: Request, response: Response, files: List[UploadFile] = File(...)):
+    tenant = resolve_tenant(request)
+    async with admission_controller.admit(tenant), track_job("code_review", tenant, response):
+        return await _process_code_review(files, tenant)
+
+async def _process_code_review(files: List[UploadFile], tenant: str):
+    """
+    Yüklemeler (düz dosya, zip/tar arşivi veya unified diff) diske yazılmadan, akış halinde
+    okunup doğrudan inceleme adımına verilir.
+    """
     try:
-        file_paths = []
-        for file in files:
-            file_path = os.path.join(UPLOAD_DIR, file.filename)
-            with open(file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
-            file_paths.append(file_path)
-
-        result = await run_code_review({"files": file_paths})
-
-        # Cleanup temporary files
-        for file_path in file_paths:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-
-        return result
+        budget = SourceBudget()
+        skipped = []
+        sources = (
+            source
+            for file in files
+            for source in iter_upload_sources(file.filename, file.file, skipped, budget)
+        )
+        run_code_review = get_handler("codeReview")
+        return await run_code_review({"sources": sources, "skipped": skipped, "tenant": tenant})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/processes/{process_type}/run")
-async def run_process(process_type: str, files: List[UploadFile] = File(...)):
+async def run_process(request: Request, response: Response, process_type: str, files: List[UploadFile] = File(...)):
     logger.info(f"Received request for process: {process_type}")
     
-    if process_type not in PROCESS_HANDLERS:
+    # Dosya yükleme kabul eden tek süreç kod incelemesidir; takma adı da
+    # /api/processes/code_review/run ile aynı akış yolunu kullanır (yüklemeler diske yazılmaz)
+    if process_type not in PROCESS_HANDLERS or PROCESS_ALIASES.get(process_type) != "codeReview":
         raise HTTPException(status_code=404, detail=f"Process {process_type} not found")
     
-    try:
-        file_paths = []
-        for file in files:
-            file_path = os.path.join(UPLOAD_DIR, file.filename)
-            with open(file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
-            file_paths.append(file_path)
-            logger.info(f"Saved file: {file_path}")
-
-        handler = PROCESS_HANDLERS[process_type]
-        result = await handler({"files": file_paths})
-
-        # Cleanup
-        for file_path in file_paths:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-
-        return result
-    except Exception as e:
-        logger.error(f"Process failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    tenant = resolve_tenant(request)
+    async with admission_controller.admit(tenant), track_job(process_type, tenant, response):
+        return await _process_code_review(files, tenant)
 
 if __name__ == "__main__":
+    if STLC_ENV == "production":
+        # Çok süreçli üretim modu; config'in worker sayısını görmesi için temiz bir süreçte başlatılır
+        server_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+        os.execv(sys.executable, [sys.executable, server_path])
     uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,5 @@
+"""
+benchmarks/__init__.py
+----------------------
+Performans ölçümü için mikro benchmark betiklerini içeren paket tanımlayıcı.
+"""
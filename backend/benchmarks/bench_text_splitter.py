@@ -0,0 +1,87 @@
+"""
+bench_text_splitter.py
+----------------------
+utils.text_splitter.iter_text_chunks ile code_review'da kullanılan LangChain
+RecursiveCharacterTextSplitter'ı aynı metin üzerinde karşılaştıran mikro benchmark.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_text_splitter [--size-kb 2048] [--repeat 5]
+"""
+
+import argparse
+import random
+import time
+
+from utils.text_splitter import iter_text_chunks
+
+WORDS = ["def", "return", "self", "value", "import", "test", "case", "result", "data", "config"]
+
+
+def make_text(size_kb: int, seed: int = 42) -> str:
+    """
+    Paragraf, cümle ve satır sonları içeren sentetik bir metin üretir.
+    """
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    while total < size_kb * 1024:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 16)))
+        sentence += rng.choice([". ", ".\n", "\n", "\n\n"])
+        parts.append(sentence)
+        total += len(sentence)
+    return "".join(parts)
+
+
+def iter_pages(text: str, page_size: int = 4096):
+    """
+    Sayfa bazlı (streaming) çıkarımı taklit eder.
+    """
+    for i in range(0, len(text), page_size):
+        yield text[i:i + page_size]
+
+
+def best_of(func, repeat: int):
+    timings = []
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text splitter microbenchmark")
+    parser.add_argument("--size-kb", type=int, default=2048)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--overlap", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    text = make_text(args.size_kb)
+    print(f"text: {len(text)} chars, chunk_size={args.chunk_size}, overlap={args.overlap}")
+
+    cases = {
+        "iter_text_chunks (whole text)": lambda: sum(
+            1 for _ in iter_text_chunks([text], args.chunk_size, args.overlap)),
+        "iter_text_chunks (paged)": lambda: sum(
+            1 for _ in iter_text_chunks(iter_pages(text), args.chunk_size, args.overlap)),
+        "iter_text_chunks (hard cuts)": lambda: sum(
+            1 for _ in iter_text_chunks([text], args.chunk_size, args.overlap, lookback=0)),
+    }
+
+    try:
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        splitter = RecursiveCharacterTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.overlap)
+        cases["langchain RecursiveCharacterTextSplitter"] = lambda: len(splitter.split_text(text))
+    except ImportError:
+        print("langchain is not installed; skipping RecursiveCharacterTextSplitter")
+
+    for name, func in cases.items():
+        seconds, count = best_of(func, args.repeat)
+        mb_per_s = len(text) / seconds / 1e6
+        print(f"{name:45s} {seconds * 1000:9.2f} ms  {count:6d} chunks  {mb_per_s:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
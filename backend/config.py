@@ -11,5 +11,51 @@ from dotenv import load_dotenv
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+MONGO_TIMEOUT_MS = int(os.getenv("MONGO_TIMEOUT_MS", "3000"))  # sunucu seçimi için bekleme süresi
 MODEL_API_BASE_URL = os.getenv("MODEL_API_BASE_URL", "http://localhost:1234")
 MODEL_IDENTIFIER = os.getenv("MODEL_IDENTIFIER", "llama-3.2-3b-instruct")
+
+# Model çağrıları için kabul kontrolü (core/admission.py)
+ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "4"))
+ADMISSION_TENANT_CONCURRENCY = int(os.getenv("ADMISSION_TENANT_CONCURRENCY", "2"))
+ADMISSION_MAX_QUEUE_DEPTH = int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", "32"))
+ADMISSION_TENANT_QUEUE_DEPTH = int(os.getenv("ADMISSION_TENANT_QUEUE_DEPTH", "4"))
+ADMISSION_TENANT_WEIGHTS = os.getenv("ADMISSION_TENANT_WEIGHTS", "")  # ör. "alice=2,ci-bot=0.5"
+# Çok worker'lı modda ortak depodaki kabul/çağrı kiralamalarının azami ömrü (sn); çöken süreçlere karşı güvenlik ağı
+ADMISSION_LEASE_TTL = float(os.getenv("ADMISSION_LEASE_TTL", "600"))
+# X-User-Id / X-Project-Id başlıklarına güvenilecek ön uç (proxy) IP'leri, virgülle ayrılmış ("*": hepsi).
+# Tenant bazlı sınırlar güvenilir bir ön ucun bu başlıkları doğrulayıp eklediğini varsayar; diğer
+# istemcilerde tenant, istemci IP adresidir.
+ADMISSION_TRUSTED_PROXIES = os.getenv("ADMISSION_TRUSTED_PROXIES", "")
+
+# Uygulama başlangıcında önceden import edilecek STLC adımları ("" hiçbiri, "*" hepsi, "codeReview,testPlanning")
+STLC_WARMUP_STEPS = os.getenv("STLC_WARMUP_STEPS", "")
+
+# Sunucu ayarları (server.py). STLC_ENV=production ile çok süreçli üretim modu kullanılır.
+STLC_ENV = os.getenv("STLC_ENV", "development")
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "60"))
+# server.py tarafından worker sayısına ayarlanır; 1'den büyükse admission sınırları ortak depodan uygulanır
+STLC_WORKER_COUNT = int(os.getenv("STLC_WORKER_COUNT", "1"))
+# "1" ise embedding modeli (testCaseOptimization) fork öncesi yüklenir ve worker'lar arasında paylaşılır
+STLC_PRELOAD_EMBEDDINGS = os.getenv("STLC_PRELOAD_EMBEDDINGS", "0") == "1"
+
+# Worker'lar arası ortak önbellek ve iş durumu deposu (core/shared_store.py)
+SHARED_STORE_PATH = os.getenv("SHARED_STORE_PATH", "data/shared_store.sqlite3")
+REVIEW_CACHE_TTL = int(os.getenv("REVIEW_CACHE_TTL", str(7 * 24 * 3600)))
+JOB_STATE_TTL = int(os.getenv("JOB_STATE_TTL", str(24 * 3600)))
+
+# Test Execution sandbox ayarları (stlc/test_execution.py)
+TEST_EXECUTION_TIMEOUT = float(os.getenv("TEST_EXECUTION_TIMEOUT", "30"))  # test başına saniye
+TEST_EXECUTION_MEMORY_MB = int(os.getenv("TEST_EXECUTION_MEMORY_MB", "512"))  # shard süreci başına
+TEST_EXECUTION_WORKERS = int(os.getenv("TEST_EXECUTION_WORKERS", "0"))  # 0: CPU sayısı kadar
+
+# Test sonuçları geçmişi (core/results_store.py)
+RESULTS_TREND_RUNS = int(os.getenv("RESULTS_TREND_RUNS", "30"))  # raporlardaki son koşu sayısı
+FLAKY_MIN_FLIPS = int(os.getenv("FLAKY_MIN_FLIPS", "2"))  # kararsız sayılmak için gereken durum değişimi
+RESULTS_STORE_RETRY_SECONDS = float(os.getenv("RESULTS_STORE_RETRY_SECONDS", "60"))  # MongoDB hatasından sonra bekleme
+
+# Kod incelemesi yükleme sınırları (utils/review_sources.py); arşiv ve diff'ler için de geçerlidir
+REVIEW_MAX_FILE_BYTES = int(os.getenv("REVIEW_MAX_FILE_BYTES", str(1024 * 1024)))
+REVIEW_MAX_TOTAL_BYTES = int(os.getenv("REVIEW_MAX_TOTAL_BYTES", str(32 * 1024 * 1024)))
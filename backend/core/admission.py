@@ -0,0 +1,306 @@
+"""
+admission.py
+------------
+Model (LLM) çağrılarının önüne konan, kullanıcı/proje (tenant) bazlı adil kabul kontrolü.
+
+- admit(): İstek seviyesinde kabul; kuyruk derinliği eşikleri aşılırsa AdmissionRejected
+  fırlatılır ve app.py bunu 429 + Retry-After olarak döndürür.
+- slot(): Her model çağrısı için çalışma izni. Global ve tenant başına eşzamanlılık sınırları
+  uygulanır; bekleyen çağrılar ağırlıklı adil kuyruk (start-time fair queuing) ile sıralanır.
+  Böylece 200 dosyalık bir toplu inceleme, diğer kullanıcıların etkileşimli isteklerini aç bırakmaz.
+
+Çok worker'lı üretim modunda (STLC_WORKER_COUNT > 1) sınırlar makine genelinde geçerlidir: her kabul
+ve her model çağrısı ortak depoda (core/shared_store.py) bir kiralama (lease) alır. Adil sıralama
+ise sadece worker içindedir; farklı worker'lardaki bekleyen çağrılar arasında sıralama garantisi
+yoktur, global yer açıldığında hangi worker'ın önce alacağı yoklama (polling) zamanlamasına bağlıdır.
+Ortak depo event loop'u bloklamasın diye kilidi sadece kısa süre bekler; kilitliyse ("busy") kiralama
+reddedilmiş sayılır ve yoklama aralığı üstel olarak uzatılarak tekrar denenir. Kilit yüzünden
+bırakılamayan kiralamalar da aynı zamanlayıcıyla sonradan bırakılır.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from config import (
+    ADMISSION_MAX_CONCURRENCY, ADMISSION_TENANT_CONCURRENCY,
+    ADMISSION_MAX_QUEUE_DEPTH, ADMISSION_TENANT_QUEUE_DEPTH, ADMISSION_TENANT_WEIGHTS,
+    ADMISSION_LEASE_TTL, STLC_WORKER_COUNT
+)
+from core.shared_store import shared_store
+
+DEFAULT_TENANT = "anonymous"
+REQUEST_LEASES = "admission_requests"
+CALL_LEASES = "admission_calls"
+LEASE_POLL_INTERVAL = 0.05  # global yer beklenirken ilk tekrar deneme aralığı (sn)
+LEASE_POLL_MAX_INTERVAL = 1.0  # art arda reddedilen denemelerde aralığın üst sınırı (sn)
+LEASE_ADMIT_ATTEMPTS = 4  # depo kilitliyken admit() içinde kiralama deneme sayısı
+
+
+class AdmissionRejected(Exception):
+    """
+    Kuyruk derinliği eşiği aşıldığında fırlatılır; retry_after saniye cinsindendir.
+    """
+
+    def __init__(self, tenant: str, retry_after: int, reason: str):
+        super().__init__(f"Too many pending requests for '{tenant}' ({reason}), retry after {retry_after}s")
+        self.tenant = tenant
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+def parse_weights(spec: str) -> dict:
+    """
+    "alice=2,ci-bot/nightly=0.5" biçimindeki ağırlık tanımını sözlüğe çevirir.
+    """
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        weights[name.strip()] = float(value)
+    return weights
+
+
+class AdmissionController:
+    def __init__(self, max_concurrency: int = 4, tenant_concurrency: int = 2,
+                 max_queue_depth: int = 32, tenant_queue_depth: int = 4, weights: dict = None,
+                 shared=None, lease_ttl: float = 600.0):
+        """
+        shared: Verilirse (SharedStore) sınırlar bu depo üzerinden tüm süreçler arasında uygulanır.
+        """
+        if max_concurrency < 1 or tenant_concurrency < 1:
+            raise ValueError("concurrency limits must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.tenant_concurrency = tenant_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.tenant_queue_depth = tenant_queue_depth
+        self.weights = dict(weights or {})
+        self.shared = shared
+        self.lease_ttl = lease_ttl
+        self._retry_handle = None
+        self._poll_interval = LEASE_POLL_INTERVAL
+        self._unreleased = []     # kilit yüzünden bırakılamayan (namespace, kiralama) çiftleri
+
+        self._pending = {}        # tenant -> kabul edilmiş ve bitmemiş istek sayısı
+        self._active = {}         # tenant -> çalışan model çağrısı sayısı
+        self._total_active = 0
+        self._queues = {}         # tenant -> deque[(start_tag, future)]
+        self._finish_tags = {}    # tenant -> son çağrının sanal bitiş zamanı
+        self._virtual_time = 0.0
+        self._avg_service = 1.0   # model çağrısı süresinin üstel hareketli ortalaması (sn)
+        self._rejected = 0
+
+    def weight(self, tenant: str) -> float:
+        """
+        Tenant ağırlığı; önce tam anahtar ("kullanıcı/proje"), sonra kullanıcı adı aranır.
+        """
+        if tenant in self.weights:
+            return self.weights[tenant]
+        return self.weights.get(tenant.split("/")[0], 1.0)
+
+    def queue_depth(self, tenant: str = None) -> int:
+        if tenant is None:
+            return sum(len(queue) for queue in self._queues.values())
+        return len(self._queues.get(tenant, ()))
+
+    def retry_after(self) -> int:
+        backlog = self.queue_depth() + self._total_active + 1
+        return max(1, math.ceil(self._avg_service * backlog / self.max_concurrency))
+
+    @asynccontextmanager
+    async def admit(self, tenant: str = None):
+        """
+        İstek seviyesinde kabul kontrolü. Eşikler aşılmışsa istek kuyruğa alınmadan reddedilir.
+        """
+        tenant = tenant or DEFAULT_TENANT
+        total_pending = sum(self._pending.values())
+        if total_pending >= self.max_queue_depth:
+            self._rejected += 1
+            raise AdmissionRejected(tenant, self.retry_after(), "global queue depth")
+        if self._pending.get(tenant, 0) >= self.tenant_queue_depth:
+            self._rejected += 1
+            raise AdmissionRejected(tenant, self.retry_after(), "tenant queue depth")
+
+        lease = None
+        if self.shared is not None:
+            for attempt in range(LEASE_ADMIT_ATTEMPTS):
+                lease, reason = self.shared.acquire_lease(
+                    REQUEST_LEASES, tenant, self.max_queue_depth, self.tenant_queue_depth, self.lease_ttl
+                )
+                if reason != "busy" or attempt == LEASE_ADMIT_ATTEMPTS - 1:
+                    break
+                await asyncio.sleep(LEASE_POLL_INTERVAL * 2 ** attempt)
+            if lease is None:
+                self._rejected += 1
+                detail = "shared store busy" if reason == "busy" else f"{reason} queue depth"
+                raise AdmissionRejected(tenant, self.retry_after(), detail)
+
+        self._pending[tenant] = self._pending.get(tenant, 0) + 1
+        try:
+            yield
+        finally:
+            self._pending[tenant] -= 1
+            if not self._pending[tenant]:
+                del self._pending[tenant]
+            if lease is not None:
+                self._release_lease(REQUEST_LEASES, lease)
+
+    @asynccontextmanager
+    async def slot(self, tenant: str = None, cost: float = 1.0):
+        """
+        Tek bir model çağrısı için çalışma izni alır; izin gelene kadar adil kuyrukta bekler.
+        """
+        tenant = tenant or DEFAULT_TENANT
+        start_tag = max(self._virtual_time, self._finish_tags.get(tenant, 0.0))
+        self._finish_tags[tenant] = start_tag + cost / self.weight(tenant)
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(tenant, deque()).append((start_tag, future))
+        self._dispatch()
+        try:
+            lease = await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(tenant, None, future.result())
+            else:
+                self._discard(tenant, future)
+            raise
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(tenant, time.monotonic() - started, lease)
+
+    def _dispatch(self):
+        if self._unreleased:
+            self._flush_unreleased()
+        blocked = set()  # global tenant sınırına takılan tenant'lar (bu tur için)
+        refused = False
+        while self._total_active < self.max_concurrency:
+            chosen = None
+            for tenant, queue in self._queues.items():
+                if queue and tenant not in blocked and self._active.get(tenant, 0) < self.tenant_concurrency:
+                    if chosen is None or queue[0][0] < self._queues[chosen][0][0]:
+                        chosen = tenant
+            if chosen is None:
+                break
+            start_tag, future = self._queues[chosen][0]
+            if future.done():
+                self._pop_head(chosen)
+                continue
+
+            lease = None
+            if self.shared is not None:
+                lease, reason = self.shared.acquire_lease(
+                    CALL_LEASES, chosen, self.max_concurrency, self.tenant_concurrency, self.lease_ttl
+                )
+                if lease is None:
+                    refused = True
+                    if reason != "tenant":  # "global" veya "busy": bu turda kimse yer alamaz
+                        break
+                    blocked.add(chosen)
+                    continue
+
+            self._pop_head(chosen)
+            self._virtual_time = max(self._virtual_time, start_tag)
+            self._active[chosen] = self._active.get(chosen, 0) + 1
+            self._total_active += 1
+            future.set_result(lease)
+
+        # Başka worker'lar yer tutuyorsa veya depo kilitliyse, artan aralıklarla tekrar dene
+        if refused or self._unreleased:
+            self._schedule_retry()
+        else:
+            self._poll_interval = LEASE_POLL_INTERVAL
+
+    def _schedule_retry(self):
+        if self._retry_handle is None:
+            self._retry_handle = asyncio.get_running_loop().call_later(self._poll_interval, self._retry_dispatch)
+
+    def _retry_dispatch(self):
+        self._retry_handle = None
+        self._poll_interval = min(self._poll_interval * 2, LEASE_POLL_MAX_INTERVAL)
+        self._dispatch()
+
+    def _release_lease(self, namespace: str, lease: str):
+        if not self.shared.release_lease(namespace, lease):
+            self._unreleased.append((namespace, lease))
+            self._schedule_retry()
+
+    def _flush_unreleased(self):
+        unreleased, self._unreleased = self._unreleased, []
+        for namespace, lease in unreleased:
+            if not self.shared.release_lease(namespace, lease):
+                self._unreleased.append((namespace, lease))
+
+    def _pop_head(self, tenant: str):
+        self._queues[tenant].popleft()
+        if not self._queues[tenant]:
+            del self._queues[tenant]
+
+    def _discard(self, tenant: str, future):
+        queue = self._queues.get(tenant)
+        if queue:
+            self._queues[tenant] = deque(item for item in queue if item[1] is not future)
+            if not self._queues[tenant]:
+                del self._queues[tenant]
+
+    def _release(self, tenant: str, duration: float = None, lease: str = None):
+        if lease is not None:
+            self._release_lease(CALL_LEASES, lease)
+        self._active[tenant] -= 1
+        if not self._active[tenant]:
+            del self._active[tenant]
+            if tenant not in self._queues:
+                self._finish_tags.pop(tenant, None)
+        self._total_active -= 1
+        if duration is not None:
+            self._avg_service = 0.8 * self._avg_service + 0.2 * duration
+        self._dispatch()
+
+    async def drain(self, timeout: float = 30.0) -> bool:
+        """
+        Kapanışta çalışan ve kuyruktaki model çağrılarının bitmesini bekler.
+        """
+        deadline = time.monotonic() + timeout
+        while self._total_active or self.queue_depth():
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.1)
+        return True
+
+    def stats(self) -> dict:
+        tenants = set(self._pending) | set(self._active) | set(self._queues)
+        return {
+            "max_concurrency": self.max_concurrency,
+            "tenant_concurrency": self.tenant_concurrency,
+            "shared_limits": self.shared is not None,
+            "active": self._total_active,
+            "queue_depth": self.queue_depth(),
+            "pending_requests": sum(self._pending.values()),
+            "rejected": self._rejected,
+            "avg_service_seconds": round(self._avg_service, 3),
+            "tenants": {
+                tenant: {
+                    "weight": self.weight(tenant),
+                    "pending_requests": self._pending.get(tenant, 0),
+                    "active": self._active.get(tenant, 0),
+                    "queue_depth": self.queue_depth(tenant),
+                }
+                for tenant in sorted(tenants)
+            },
+        }
+
+
+# Tek süreçte yerel sayaçlar yeterlidir; çok worker'lı modda sınırlar ortak depo üzerinden uygulanır
+admission_controller = AdmissionController(
+    max_concurrency=ADMISSION_MAX_CONCURRENCY,
+    tenant_concurrency=ADMISSION_TENANT_CONCURRENCY,
+    max_queue_depth=ADMISSION_MAX_QUEUE_DEPTH,
+    tenant_queue_depth=ADMISSION_TENANT_QUEUE_DEPTH,
+    weights=parse_weights(ADMISSION_TENANT_WEIGHTS),
+    shared=shared_store if STLC_WORKER_COUNT > 1 else None,
+    lease_ttl=ADMISSION_LEASE_TTL,
+)
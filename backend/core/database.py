@@ -3,11 +3,26 @@ database.py
 -----------
 MongoDB bağlantısını ve temel veritabanı işlemlerini yönetir.
 Örneğin, koleksiyonlara erişim, CRUD işlemleri gibi fonksiyonları burada tanımlayabilirsiniz.
+
+MongoClient kendi bağlantı havuzunu yönettiği için süreç başına bir kez oluşturulur ve tekrar kullanılır.
 """
 
+import os
+from functools import lru_cache
+
 from pymongo import MongoClient
-from config import MONGO_URI
+from config import MONGO_URI, MONGO_TIMEOUT_MS
+
+
+@lru_cache(maxsize=None)
+def _client_for_process(pid: int) -> MongoClient:
+    # MongoClient fork güvenli değildir; pid anahtarı sayesinde her worker kendi istemcisini açar
+    return MongoClient(MONGO_URI, serverSelectionTimeoutMS=MONGO_TIMEOUT_MS)
+
+
+def get_client() -> MongoClient:
+    return _client_for_process(os.getpid())
+
 
 def get_db():
-    client = MongoClient(MONGO_URI)
-    return client["stlc_database"]  # Örnek veritabanı adı
+    return get_client()["stlc_database"]  # Örnek veritabanı adı
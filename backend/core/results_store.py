@@ -0,0 +1,303 @@
+"""
+results_store.py
+----------------
+Test sonuçları geçmişini MongoDB'de tutar (core/database.py üzerine).
+
+- test_results: Ham sonuçlar; sadece eklenir (append-only), run/test/gereksinim/durum indeksli.
+- test_runs, test_stats, requirement_stats: Koşu, test ve gereksinim bazında özetler. Her kayıt
+  sırasında $inc / pipeline update ile artımlı güncellenir; böylece raporlar (başarı trendi,
+  kararsız testler, gereksinim kapsamı) ham sonuçları taramadan, doğrudan özetlerden üretilir.
+
+Kararsız (flaky) test tespiti için her testin son sonucu (pass/fail) saklanır ve sonuç her
+değiştiğinde "flips" sayacı artırılır.
+
+MongoDB'ye ulaşılamazsa depo RESULTS_STORE_RETRY_SECONDS boyunca "erişilemez" işaretlenir; bu
+sürede çağrılar sunucu seçimi zaman aşımını beklemeden hemen ResultsStoreUnavailable fırlatır.
+"""
+
+import logging
+import os
+import time
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import ConnectionFailure, PyMongoError
+
+from config import RESULTS_TREND_RUNS, FLAKY_MIN_FLIPS, RESULTS_STORE_RETRY_SECONDS
+from core.database import get_db
+
+logger = logging.getLogger("results_store")
+
+STATUSES = ("passed", "failed", "error", "timeout", "skipped")
+FAILING_STATUSES = ("failed", "error", "timeout")
+
+
+class ResultsStoreUnavailable(PyMongoError):
+    """
+    Son bağlantı hatasından sonraki bekleme süresi içinde, sunucuya gidilmeden fırlatılır.
+    """
+
+
+def outcome_of(status: str):
+    """
+    Kararsızlık hesabında kullanılan sonuç: "pass", "fail" veya (atlanan testler için) None.
+    """
+    if status == "passed":
+        return "pass"
+    if status in FAILING_STATUSES:
+        return "fail"
+    return None
+
+
+def normalize_requirement_ids(requirements) -> list:
+    """
+    Pipeline girdisindeki gereksinimleri id listesine çevirir. testScenarioOptimization ile aynı
+    biçimler kabul edilir: düz id'ler veya {"id", "priority", ...} sözlükleri (id'siz sözlükler atlanır).
+    """
+    ids = []
+    for requirement in requirements or []:
+        requirement_id = requirement.get("id") if isinstance(requirement, dict) else requirement
+        if requirement_id is not None and requirement_id not in ids:
+            ids.append(requirement_id)
+    return ids
+
+
+def pass_rate(counts: dict) -> float:
+    executed = sum(counts.get(status, 0) for status in STATUSES if status != "skipped")
+    return round(counts.get("passed", 0) / executed, 4) if executed else 0.0
+
+
+def _test_stats_update(result: dict, run_id: str, now: float) -> list:
+    """
+    Tek test sonucu için test_stats pipeline update'i: sayaçlar artırılır, son sonuç öncekinden
+    farklıysa flips bir artar. Aynı belge üzerinde atomik çalışır.
+    """
+    status = result["status"]
+    outcome = outcome_of(status)
+    fields = {
+        "runs": {"$add": [{"$ifNull": ["$runs", 0]}, 1]},
+        f"counts.{status}": {"$add": [{"$ifNull": [f"$counts.{status}", 0]}, 1]},
+        "total_duration": {"$add": [{"$ifNull": ["$total_duration", 0]}, result["duration"]]},
+        "last_status": status,
+        "last_run_id": run_id,
+        "last_seen": now,
+        "first_seen": {"$ifNull": ["$first_seen", now]},
+    }
+    if outcome is not None:
+        changed = {"$and": [
+            {"$ne": [{"$ifNull": ["$last_outcome", None]}, None]},
+            {"$ne": ["$last_outcome", outcome]},
+        ]}
+        fields["flips"] = {"$add": [{"$ifNull": ["$flips", 0]}, {"$cond": [changed, 1, 0]}]}
+        fields["last_outcome"] = outcome
+    else:
+        fields["flips"] = {"$ifNull": ["$flips", 0]}
+    return [{"$set": fields}]
+
+
+class ResultsStore:
+    def __init__(self, db_factory=get_db, retry_seconds: float = RESULTS_STORE_RETRY_SECONDS):
+        self._db_factory = db_factory
+        self._indexed_pid = None
+        self.retry_seconds = retry_seconds
+        self._unavailable_until = 0.0
+
+    def _mark_unavailable(self, error: Exception):
+        self._unavailable_until = time.monotonic() + self.retry_seconds
+        logger.warning(f"Results store unavailable, retrying in {self.retry_seconds:g}s: {error}")
+
+    def _db(self):
+        if time.monotonic() < self._unavailable_until:
+            raise ResultsStoreUnavailable("results store is unavailable (backing off after a connection error)")
+        try:
+            db = self._db_factory()
+            if self._indexed_pid != os.getpid():
+                self.ensure_indexes(db)
+                self._indexed_pid = os.getpid()
+        except ConnectionFailure as e:
+            self._mark_unavailable(e)
+            raise
+        return db
+
+    @staticmethod
+    def ensure_indexes(db):
+        db.test_results.create_index([("run_id", ASCENDING)])
+        db.test_results.create_index([("test_id", ASCENDING), ("recorded_at", DESCENDING)])
+        db.test_results.create_index([("requirement_ids", ASCENDING)])
+        db.test_results.create_index([("status", ASCENDING), ("recorded_at", DESCENDING)])
+        db.test_runs.create_index([("started_at", DESCENDING)])
+        db.test_stats.create_index([("flips", DESCENDING)])
+        db.requirement_stats.create_index([("last_seen", DESCENDING)])
+
+    def record_results(self, run_id: str, results: list, requirement_map: dict = None, started_at: float = None) -> int:
+        """
+        Bir koşunun sonuçlarını ekler ve özetleri günceller.
+        results: {"test" | "test_id", "status", "duration", "message", "requirement_ids"} sözlükleri.
+        requirement_map: Sonuçta gereksinim yoksa kullanılacak test_id -> [gereksinim id] eşlemesi.
+        """
+        if not results:
+            return 0
+        db = self._db()
+        requirement_map = requirement_map or {}
+        now = time.time()
+
+        documents = []
+        run_counts = {}
+        run_duration = 0.0
+        requirement_updates = {}
+        for result in results:
+            test_id = result.get("test_id") or result["test"]
+            status = result["status"] if result.get("status") in STATUSES else "error"
+            requirement_ids = list(result.get("requirement_ids") or requirement_map.get(test_id, []))
+            document = {
+                "run_id": run_id,
+                "test_id": test_id,
+                "status": status,
+                "duration": float(result.get("duration") or 0.0),
+                "message": result.get("message", ""),
+                "requirement_ids": requirement_ids,
+                "recorded_at": now,
+            }
+            documents.append(document)
+            run_counts[status] = run_counts.get(status, 0) + 1
+            run_duration += document["duration"]
+            for requirement_id in requirement_ids:
+                update = requirement_updates.setdefault(requirement_id, {"counts": {}, "tests": set()})
+                update["counts"][status] = update["counts"].get(status, 0) + 1
+                update["tests"].add(test_id)
+
+        try:
+            self._write(db, run_id, documents, run_counts, run_duration, requirement_updates, now, started_at)
+        except ConnectionFailure as e:
+            self._mark_unavailable(e)
+            raise
+        return len(documents)
+
+    @staticmethod
+    def _write(db, run_id, documents, run_counts, run_duration, requirement_updates, now, started_at):
+        db.test_results.insert_many(documents, ordered=False)
+
+        db.test_runs.update_one(
+            {"_id": run_id},
+            {
+                "$inc": {"total": len(documents), "duration": run_duration,
+                         **{f"counts.{status}": count for status, count in run_counts.items()}},
+                "$min": {"started_at": now if started_at is None else started_at},
+                "$max": {"finished_at": now},
+            },
+            upsert=True,
+        )
+        # Sıralı (ordered) bulk: aynı testin bir batch'teki birden fazla sonucu sırayla uygulanır
+        db.test_stats.bulk_write([
+            UpdateOne({"_id": document["test_id"]}, _test_stats_update(document, run_id, now), upsert=True)
+            for document in documents
+        ])
+        if requirement_updates:
+            db.requirement_stats.bulk_write([
+                UpdateOne(
+                    {"_id": requirement_id},
+                    {
+                        "$inc": {"total": sum(update["counts"].values()),
+                                 **{f"counts.{status}": count for status, count in update["counts"].items()}},
+                        "$addToSet": {"tests": {"$each": sorted(update["tests"])}},
+                        "$set": {"last_run_id": run_id, "last_seen": now},
+                    },
+                    upsert=True,
+                )
+                for requirement_id, update in requirement_updates.items()
+            ], ordered=False)
+
+    def pass_rate_trend(self, limit: int = RESULTS_TREND_RUNS) -> list:
+        """
+        Son `limit` koşunun başarı oranları (eskiden yeniye).
+        """
+        runs = list(self._db().test_runs.find().sort("started_at", DESCENDING).limit(limit))
+        return [
+            {
+                "run_id": run["_id"],
+                "started_at": run.get("started_at"),
+                "total": run.get("total", 0),
+                "counts": run.get("counts", {}),
+                "pass_rate": pass_rate(run.get("counts", {})),
+            }
+            for run in reversed(runs)
+        ]
+
+    def flaky_tests(self, min_flips: int = FLAKY_MIN_FLIPS, limit: int = 20) -> list:
+        tests = self._db().test_stats.find({"flips": {"$gte": min_flips}}).sort("flips", DESCENDING).limit(limit)
+        return [
+            {
+                "test_id": test["_id"],
+                "flips": test["flips"],
+                "runs": test.get("runs", 0),
+                "pass_rate": pass_rate(test.get("counts", {})),
+                "last_status": test.get("last_status"),
+            }
+            for test in tests
+        ]
+
+    def requirement_coverage(self, requirement_ids: list = None) -> dict:
+        """
+        Gereksinim bazında kapsam: bir gereksinim, bağlı tüm testlerin son sonucu başarılıysa "passing",
+        en az biri başarısızsa "failing" sayılır. requirement_ids verilirse sonucu olmayanlar "untested" olur.
+        """
+        db = self._db()
+        query = {"_id": {"$in": list(requirement_ids)}} if requirement_ids else {}
+        requirements = list(db.requirement_stats.find(query))
+        test_ids = {test_id for requirement in requirements for test_id in requirement.get("tests", [])}
+        last_outcomes = {
+            test["_id"]: test.get("last_outcome")
+            for test in db.test_stats.find({"_id": {"$in": list(test_ids)}}, {"last_outcome": 1})
+        }
+
+        rows = []
+        summary = {"passing": 0, "failing": 0, "unknown": 0, "untested": 0}
+        for requirement in requirements:
+            outcomes = [last_outcomes.get(test_id) for test_id in requirement.get("tests", [])]
+            if "fail" in outcomes:
+                status = "failing"
+            elif outcomes and all(outcome == "pass" for outcome in outcomes):
+                status = "passing"
+            else:
+                status = "unknown"
+            summary[status] += 1
+            rows.append({
+                "requirement_id": requirement["_id"],
+                "tests": len(requirement.get("tests", [])),
+                "total": requirement.get("total", 0),
+                "pass_rate": pass_rate(requirement.get("counts", {})),
+                "status": status,
+            })
+        if requirement_ids:
+            seen = {row["requirement_id"] for row in rows}
+            for requirement_id in requirement_ids:
+                if requirement_id not in seen:
+                    rows.append({"requirement_id": requirement_id, "tests": 0, "total": 0,
+                                 "pass_rate": 0.0, "status": "untested"})
+                    summary["untested"] += 1
+        summary["total"] = len(rows)
+        return {"requirements": rows, "summary": summary}
+
+    def totals(self) -> dict:
+        """
+        Tüm geçmişin toplamları; koşu özetleri üzerinden hesaplanır (ham sonuç taranmaz).
+        """
+        group = {"_id": None, "runs": {"$sum": 1}, "total": {"$sum": "$total"},
+                 "first_run": {"$min": "$started_at"}, "last_run": {"$max": "$finished_at"}}
+        for status in STATUSES:
+            group[status] = {"$sum": {"$ifNull": [f"$counts.{status}", 0]}}
+        rows = list(self._db().test_runs.aggregate([{"$group": group}]))
+        if not rows:
+            return {"runs": 0, "total": 0, "counts": {}, "pass_rate": 0.0}
+        row = rows[0]
+        counts = {status: row[status] for status in STATUSES if row[status]}
+        return {
+            "runs": row["runs"],
+            "total": row["total"],
+            "counts": counts,
+            "pass_rate": pass_rate(counts),
+            "first_run": row["first_run"],
+            "last_run": row["last_run"],
+        }
+
+
+results_store = ResultsStore()
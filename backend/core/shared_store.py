@@ -0,0 +1,206 @@
+"""
+shared_store.py
+---------------
+Aynı makinedeki tüm worker süreçlerinin ortak kullandığı yerel anahtar/değer deposu.
+SQLite (WAL modu) üzerine kuruludur; önbellekler (ör. kod inceleme sonuçları) ve iş (job)
+durumları bu sayede hangi worker'a gelinirse gelinsin aynı görünür.
+
+Bağlantılar süreç (pid) ve thread bazında açılır; fork sonrası ebeveynden kalan bağlantı kullanılmaz.
+
+acquire_lease/release_lease, worker'lar arası sayaçlar (ör. admission sınırları) için kullanılır:
+her kiralama (lease) sahibinin pid'iyle saklanır, sahibi ölmüş kiralamalar otomatik düşürülür.
+Bu işlemler event loop üzerinden çağrıldığı için kilit en fazla LEASE_BUSY_TIMEOUT_MS beklenir;
+depo kilitliyse kiralama "busy" nedeniyle reddedilir, çağıran daha sonra tekrar dener.
+"""
+
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from config import SHARED_STORE_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (namespace, key)
+)
+"""
+
+PURGE_EVERY_SETS = 1000  # süresi dolan kayıtlar her bu kadar set() çağrısında bir temizlenir
+BUSY_TIMEOUT = 10  # genel işlemlerde kilit bekleme süresi (sn)
+LEASE_BUSY_TIMEOUT_MS = 25  # kiralama işlemlerinde kilit bekleme süresi (ms)
+
+
+class SharedStore:
+    def __init__(self, path: str, purge_every: int = PURGE_EVERY_SETS):
+        self.path = path
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._set_calls = itertools.count(1)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, namespace: str, key: str, default=None):
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        if row is None:
+            return default
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            self.delete(namespace, key)
+            return default
+        return json.loads(value)
+
+    def set(self, namespace: str, key: str, value, ttl: float = None):
+        """
+        Değeri JSON olarak saklar; ttl (saniye) verilirse süre sonunda geçersiz olur.
+        """
+        expires_at = time.time() + ttl if ttl else None
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), expires_at),
+        )
+        # Önbellek anahtarları (prompt hash'leri) nadiren tekrar okunur; dosya büyümesin diye arada bir temizle
+        if self.purge_every and next(self._set_calls) % self.purge_every == 0 and not conn.in_transaction:
+            self.purge_expired()
+
+    def update(self, namespace: str, key: str, changes: dict, ttl: float = None) -> dict:
+        """
+        Sözlük değerini tek bir işlem (transaction) içinde okuyup günceller.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = self.get(namespace, key, default={}) or {}
+            current.update(changes)
+            self.set(namespace, key, current, ttl=ttl)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return current
+
+    def delete(self, namespace: str, key: str):
+        self._connection().execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+
+    @contextmanager
+    def _busy_timeout(self, milliseconds: int):
+        conn = self._connection()
+        conn.execute(f"PRAGMA busy_timeout = {int(milliseconds)}")
+        try:
+            yield conn
+        finally:
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT * 1000}")
+
+    def acquire_lease(self, namespace: str, tenant: str, limit: int, tenant_limit: int, ttl: float,
+                      busy_timeout_ms: int = LEASE_BUSY_TIMEOUT_MS) -> tuple:
+        """
+        Toplamda `limit`, tenant başına `tenant_limit` adet eşzamanlı kiralama izin verir.
+        Sayım ve ekleme tek bir işlemde (BEGIN IMMEDIATE) yapılır; süresi dolan veya sahibi
+        artık çalışmayan süreçlere ait kiralamalar önce temizlenir.
+        return: (kiralama anahtarı, None) veya yer yoksa (None, "global" | "tenant");
+        depo `busy_timeout_ms` içinde kilitlenemezse (None, "busy").
+        """
+        with self._busy_timeout(busy_timeout_ms) as conn:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError as e:
+                if _is_busy(e):
+                    return None, "busy"
+                raise
+            return self._acquire_locked(conn, namespace, tenant, limit, tenant_limit, ttl)
+
+    @staticmethod
+    def _acquire_locked(conn, namespace: str, tenant: str, limit: int, tenant_limit: int, ttl: float) -> tuple:
+        now = time.time()
+        try:
+            conn.execute(
+                "DELETE FROM kv WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at < ?", (namespace, now)
+            )
+            holders = []
+            for key, value in conn.execute("SELECT key, value FROM kv WHERE namespace = ?", (namespace,)).fetchall():
+                holder = json.loads(value)
+                if _pid_alive(holder["pid"]):
+                    holders.append(holder)
+                else:
+                    conn.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+
+            if len(holders) >= limit:
+                key, reason = None, "global"
+            elif sum(1 for holder in holders if holder["tenant"] == tenant) >= tenant_limit:
+                key, reason = None, "tenant"
+            else:
+                key, reason = uuid.uuid4().hex, None
+                conn.execute(
+                    "INSERT INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (namespace, key, json.dumps({"tenant": tenant, "pid": os.getpid()}), now + ttl),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return key, reason
+
+    def release_lease(self, namespace: str, key: str, busy_timeout_ms: int = LEASE_BUSY_TIMEOUT_MS) -> bool:
+        """
+        Kiralamayı siler; depo kilitli olduğu için silinemezse False döner (çağıran tekrar dener).
+        """
+        with self._busy_timeout(busy_timeout_ms) as conn:
+            try:
+                conn.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+            except sqlite3.OperationalError as e:
+                if _is_busy(e):
+                    return False
+                raise
+        return True
+
+    def purge_expired(self) -> int:
+        """
+        Süresi dolmuş tüm kayıtları siler (worker başlangıcında ve periyodik olarak set() içinden çağrılır).
+        """
+        cursor = self._connection().execute(
+            "DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name != "posix":
+        return True  # Windows'ta os.kill sinyal göndermek yerine süreci sonlandırır; sadece TTL'e güvenilir
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+shared_store = SharedStore(SHARED_STORE_PATH)
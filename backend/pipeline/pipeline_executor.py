@@ -5,28 +5,11 @@ determine_pipeline fonksiyonundan gelen adım listesini sırasıyla çalıştır
 Her adımın giriş-çıkış verilerini yönetir ve son toplu çıktıyı oluşturur.
 """
 
-from stlc import (
-    code_review, requirement_analysis, test_planning, test_scenario_generation,
-    test_scenario_optimization, test_case_generation, test_case_optimization,
-    test_code_generation, environment_setup, test_execution, test_reporting, test_closure
-)
+from stlc.registry import module_map
 from pipeline.pipeline_controller import determine_pipeline
 
-# STLC adımlarına erişmek için basit bir harita oluşturuyoruz
-STLC_MODULE_MAP = {
-    "codeReview": code_review,
-    "requirementAnalysis": requirement_analysis,
-    "testPlanning": test_planning,
-    "testScenarioGeneration": test_scenario_generation,
-    "testScenarioOptimization": test_scenario_optimization,
-    "testCaseGeneration": test_case_generation,
-    "testCaseOptimization": test_case_optimization,
-    "testCodeGeneration": test_code_generation,
-    "environmentSetup": environment_setup,
-    "testExecution": test_execution,
-    "testReporting": test_reporting,
-    "testClosure": test_closure
-}
+# STLC adımlarına erişmek için harita; modüller ilk kullanımda import edilir
+STLC_MODULE_MAP = module_map()
 
 def run_pipeline(steps_selected, input_data=None):
     pipeline_steps = determine_pipeline(steps_selected)
@@ -0,0 +1,113 @@
+"""
+server.py
+---------
+Üretim (production) modunda çok süreçli sunucu başlatıcı.
+
+- Gunicorn pre-fork master + Uvicorn worker'ları kullanılır; worker sayısı varsayılan olarak
+  sürece atanmış CPU çekirdeği sayısıdır (WEB_CONCURRENCY ile değiştirilebilir).
+- Uygulama, STLC adımları ve ollama istemcisi (STLC_PRELOAD_EMBEDDINGS=1 ise embedding modeli de)
+  fork'tan önce master süreçte yüklenir (preload); böylece bellek sayfaları worker'lar arasında
+  copy-on-write olarak paylaşılır.
+- SIGTERM alındığında worker'lar yeni bağlantı kabul etmeyi bırakır ve GRACEFUL_TIMEOUT
+  süresince çalışan istekleri tamamlar (app.py shutdown olayı model çağrılarını boşaltır).
+
+Kullanım (backend klasöründen):
+    python server.py
+    python server.py --app-dir ../ornek_backend --app backend:app --preload backend:get_embedding_model
+"""
+
+import argparse
+import importlib
+import logging
+import os
+import sys
+
+from utils.system_info import available_cpus
+
+logger = logging.getLogger("server")
+
+
+def worker_count() -> int:
+    workers = int(os.getenv("WEB_CONCURRENCY", "0"))
+    return workers if workers > 0 else available_cpus()
+
+
+def import_from_string(spec: str):
+    """
+    "modul:nesne" biçimindeki tanımı import edip nesneyi döndürür.
+    """
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def preload_backend():
+    """
+    Ana backend için fork öncesi ısınma: tüm STLC adımları ve bağımlılıkları, ayrıca adımların ilk
+    çağrıda import ettiği ollama istemcisi yüklenir. STLC_PRELOAD_EMBEDDINGS=1 ise embedding modeli
+    de yüklenir (varsayılan kapalı: model belleği büyüktür ve her kurulumda kullanılmaz).
+    """
+    from config import STLC_PRELOAD_EMBEDDINGS
+    from stlc.registry import warm_up
+    warm_up()
+    importlib.import_module("ollama")
+    if STLC_PRELOAD_EMBEDDINGS:
+        from stlc.test_case_optimization import _embedding_model
+        _embedding_model()
+
+
+def serve(app_spec: str = "app:app", preload_spec: str = None, app_dir: str = None, workers: int = None):
+    from gunicorn.app.base import BaseApplication
+
+    workers = workers or worker_count()
+    # Worker'lar config üzerinden toplam worker sayısını görür (ör. admission sınırlarını bölmek için)
+    os.environ["STLC_WORKER_COUNT"] = str(workers)
+    if app_dir:
+        app_dir = os.path.abspath(app_dir)
+        sys.path.insert(0, app_dir)
+    from config import SERVER_HOST, SERVER_PORT, GRACEFUL_TIMEOUT
+
+    options = {
+        "bind": f"{SERVER_HOST}:{SERVER_PORT}",
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "graceful_timeout": GRACEFUL_TIMEOUT,
+        "timeout": GRACEFUL_TIMEOUT * 2,
+        "keepalive": 5,
+    }
+    if app_dir:
+        options["chdir"] = app_dir
+
+    class ProductionApplication(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # preload_app=True olduğundan bu metot fork'tan önce master süreçte bir kez çalışır
+            application = import_from_string(app_spec)
+            if preload_spec:
+                import_from_string(preload_spec)()
+            logger.info(f"Preloaded {app_spec}; forking {workers} workers")
+            return application
+
+    ProductionApplication().run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STLC Manager production server")
+    parser.add_argument("--app", default="app:app", help="ASGI uygulaması (modul:nesne)")
+    parser.add_argument("--preload", default=None, help="Fork öncesi çağrılacak fonksiyon (modul:fonksiyon)")
+    parser.add_argument("--app-dir", default=None, help="Uygulama modülünün bulunduğu dizin")
+    parser.add_argument("--workers", type=int, default=None, help="Worker sayısı (varsayılan: CPU sayısı)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    preload = args.preload
+    if preload is None and args.app == "app:app" and not args.app_dir:
+        preload = "server:preload_backend"
+    serve(args.app, preload, args.app_dir, args.workers)
+
+
+if __name__ == "__main__":
+    main()
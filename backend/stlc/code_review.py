@@ -1,23 +1,37 @@
 import os
+import asyncio
+import hashlib
 import logging
 import time
 from io import BytesIO
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.responses import JSONResponse
-from ollama import chat
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from utils.text_splitter import iter_text_chunks
+from utils.code_triage import analyze_file, triage_chunk, format_hints
+from utils.review_sources import SourceBudget, iter_upload_sources
+from core.admission import admission_controller
+from core.shared_store import shared_store
+from config import REVIEW_CACHE_TTL
 
 # Remove this line as it causes circular import
 # from stlc.code_review import run_step as run_code_review
 
-app = FastAPI()
 logger = logging.getLogger("code_review")
-logging.basicConfig(level=logging.INFO)
 
 # LLM için token limiti ve chunk ayarları (backend.py ile uyumlu)
 LLM_TOKEN_LIMIT = 4096
 BASE_CHUNK_SIZE = 1000
 MIN_CHUNK_SIZE = 500
+CHUNK_OVERLAP = 100
+REVIEW_MODEL = "llama3.2"
+REVIEW_CACHE_NAMESPACE = "code_review"
+
+def chat(**kwargs):
+    """
+    ollama istemcisini ilk çağrıda import eder; modül yüklemesini hafif tutar.
+    """
+    from ollama import chat as ollama_chat
+    return ollama_chat(**kwargs)
 
 def count_tokens(text: str) -> int:
     """
@@ -44,9 +58,126 @@ def sanitize_text(text: str) -> str:
     """
     return " ".join(text.split())
 
-async def review_chunk(file_name: str, chunk: str, chunk_index: int, total_chunks: int) -> str:
+def chunk_line_ranges(text: str, chunks: list) -> list:
+    """
+    Her chunk'ın metindeki (ilk, son) satır numaralarını bulur. Chunk'lar sırayla ve en fazla
+    CHUNK_OVERLAP kadar örtüşerek geldiği için arama bir önceki chunk'ın sonundan geriye
+    overlap kadar başlar; satır sayımı da artımlı yapılır.
+    """
+    ranges = []
+    search_from = 0
+    counted_to = 0
+    line = 1
+    for chunk in chunks:
+        start = text.find(chunk, search_from)
+        if start == -1:
+            start = text.find(chunk)
+        if start < counted_to:
+            counted_to, line = 0, 1
+        line += text.count("\n", counted_to, start)
+        counted_to = start
+        ranges.append((line, line + chunk.rstrip("\n").count("\n")))
+        search_from = max(0, start + len(chunk) - CHUNK_OVERLAP)
+    return ranges
+
+def plan_review_jobs(sources) -> tuple:
+    """
+    sources: (file_name, code_content) çiftleri; arşivlerden okunan kaynaklar için generator olabilir.
+    Her dosyayı chunk'lara ayırır ve LLM'e gitmeden önce statik ön analizden (code_triage) geçirir.
+    Üretilmiş/vendored dosyalar ve sadece import/sabit içeren chunk'lar atlanır.
+    return: (risk skoruna göre azalan sırada inceleme işleri, atlanan dosya/chunk listesi)
+    """
+    jobs = []
+    skipped = []
+    for file_name, code_content in sources:
+        if not code_content.strip():
+            logger.warning(f"No valid content found in {file_name}")
+            skipped.append({"file_name": file_name, "reason": "empty"})
+            continue
+
+        file_triage = analyze_file(file_name, code_content)
+        if file_triage["skip"]:
+            logger.info(f"Skipping {file_name}: {file_triage['reason']}")
+            skipped.append({"file_name": file_name, "reason": file_triage["reason"]})
+            continue
+
+        # Dinamik chunk boyutu belirleme ve chunking işlemi (satır yapısı korunarak)
+        chunk_size = determine_chunk_size(code_content)
+        chunks = list(iter_text_chunks([code_content], chunk_size=chunk_size, overlap=CHUNK_OVERLAP))
+        total_chunks = len(chunks)
+        logger.info(f"File {file_name} split into {total_chunks} chunks (chunk size: {chunk_size}).")
+
+        for idx, (chunk, line_range) in enumerate(zip(chunks, chunk_line_ranges(code_content, chunks))):
+            triage = triage_chunk(file_name, chunk, file_triage["findings"], line_range)
+            if triage["skip"]:
+                skipped.append({"file_name": file_name, "chunk": idx + 1, "reason": triage["kind"]})
+                continue
+            jobs.append({
+                "file_name": file_name,
+                "chunk": sanitize_text(chunk),
+                "chunk_index": idx,
+                "total_chunks": total_chunks,
+                "risk": triage["risk"],
+                "hints": triage["hints"],
+            })
+
+    # En riskli chunk'lar önce incelenir; eşit skorlarda dosya/chunk sırası korunur
+    jobs.sort(key=lambda job: -job["risk"])
+    return jobs, skipped
+
+async def run_review_jobs(jobs: list, tenant: str = None) -> list:
+    """
+    İnceleme işlerini risk sırasıyla çalıştırır ve sonuçları dosya bazında birleştirir.
+    tenant: Model çağrılarının adil kuyrukta hangi kullanıcı/proje adına sıraya gireceği.
+    Dosyalar en riskli chunk'larının sırasına göre, chunk'lar ise dosya içi sıraya göre döndürülür.
+    """
+    per_file = {}
+    for job in jobs:
+        review = await review_chunk(
+            job["file_name"], job["chunk"], job["chunk_index"], job["total_chunks"], hints=job["hints"], tenant=tenant
+        )
+        entry = per_file.setdefault(job["file_name"], {"risk": job["risk"], "chunks": []})
+        entry["chunks"].append((job["chunk_index"], job["total_chunks"], review))
+
+    results = []
+    for file_name, entry in per_file.items():
+        file_reviews = [
+            f"Chunk {idx+1}/{total} Review:\n{review}"
+            for idx, total, review in sorted(entry["chunks"], key=lambda item: item[0])
+        ]
+        results.append({
+            "file_name": file_name,
+            "risk": entry["risk"],
+            "review": "\n\n".join(file_reviews)
+        })
+    return results
+
+def cached_review(cache_key: str):
+    """
+    Önbellekteki incelemeyi döndürür; önbellek okunamazsa (ör. kilitli SQLite) None döner.
+    """
+    try:
+        return shared_store.get(REVIEW_CACHE_NAMESPACE, cache_key)
+    except Exception as e:
+        logger.warning(f"Review cache read failed: {e}")
+        return None
+
+def cache_review(cache_key: str, review: str):
+    """
+    İncelemeyi önbelleğe yazar; yazma hatası (ör. kilitli/dolu SQLite) model cevabını geçersiz kılmaz.
+    """
+    try:
+        shared_store.set(REVIEW_CACHE_NAMESPACE, cache_key, review, ttl=REVIEW_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Review cache write failed: {e}")
+
+async def review_chunk(file_name: str, chunk: str, chunk_index: int, total_chunks: int,
+                       hints: list = None, tenant: str = None) -> str:
     """
     Verilen kod parçası (chunk) için detaylı kod incelemesi talep eder.
+    hints: Statik ön analizden gelen ve prompt'a eklenen bulgular.
+    Çağrı, admission_controller üzerinden tenant'ın adil payı kadar eşzamanlı çalışır;
+    senkron ollama istemcisi event loop'u bloklamasın diye ayrı thread'de çalıştırılır.
     """
     prompt = (
         f"Please perform a detailed code review of the following code snippet from file '{file_name}' "
@@ -57,121 +188,120 @@ async def review_chunk(file_name: str, chunk: str, chunk_index: int, total_chunk
         "3. Best practices\n"
         "4. Security concerns\n"
         "Provide structured feedback with suggestions for improvement.\n\n"
+        f"{format_hints(hints)}"
         f"Code:\n{chunk}"
     )
+    # Aynı prompt daha önce (herhangi bir worker'da) incelendiyse model çağrılmaz
+    cache_key = hashlib.sha256(f"{REVIEW_MODEL}\0{prompt}".encode("utf-8")).hexdigest()
+    cached = cached_review(cache_key)
+    if cached is not None:
+        return cached
     try:
-        response = chat(
-            model="llama3.2",
-            messages=[{"role": "user", "content": prompt}]
-        )
+        async with admission_controller.slot(tenant):
+            response = await asyncio.to_thread(
+                chat,
+                model=REVIEW_MODEL,
+                messages=[{"role": "user", "content": prompt}]
+            )
         # Beklenen cevap sözlüğün içinde yer alıyor
-        return response['message']['content']
+        review = response['message']['content']
     except Exception as e:
         logger.error(f"Error during review API call for {file_name} chunk {chunk_index+1}: {e}")
         raise HTTPException(status_code=500, detail=f"Error during review API call for {file_name}")
+    cache_review(cache_key, review)
+    return review
 
-@app.post("/api/processes/code_review/run")  # Changed underscore to hyphen
 async def process_code_review(files: list[UploadFile] = File(...)):
     """
     Birden fazla dosya yüklenebilen kod incelemesi endpoint’i.
+    Düz dosyaların yanında zip/tar arşivleri ve unified diff'ler de kabul edilir (utils/review_sources.py).
     Her dosya için:
-    - Dosya içeriği UTF-8 olarak okunur,
-    - sanitize edilir,
-    - RecursiveCharacterTextSplitter kullanılarak dinamik olarak parçalara ayrılır,
-    - Her parça için Ollama chat API çağrısı yapılır,
+    - Dosya içeriği UTF-8 olarak okunur (binary/vendored girişler okunmadan atlanır),
+    - Statik ön analizden geçirilir; üretilmiş/vendored dosyalar ve önemsiz chunk'lar atlanır,
+    - Satır sınırları korunarak dinamik olarak parçalara ayrılır,
+    - Her parça için risk sırasına göre Ollama chat API çağrısı yapılır,
     - Tüm chunk’lerin sonuçları dosya bazında birleştirilir ve yapılandırılmış olarak döndürülür.
     """
     if not files:
         raise HTTPException(status_code=400, detail="Hiçbir dosya yüklenmedi.")
 
-    all_reviews = []
-    for file in files:
-        try:
-            contents = await file.read()
-            code_content = contents.decode("utf-8")
-        except Exception as e:
-            logger.error(f"Error reading file {file.filename}: {e}")
-            raise HTTPException(status_code=400, detail=f"Error reading file {file.filename}: {e}")
-        
-        code_content = sanitize_text(code_content)
-        if not code_content.strip():
-            logger.warning(f"No valid content found in {file.filename}")
-            continue
-
-        # Dinamik chunk boyutu belirleme ve chunking işlemi
-        chunk_size = determine_chunk_size(code_content)
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=100)
-        chunks = text_splitter.split_text(code_content)
-        total_chunks = len(chunks)
-        logger.info(f"File {file.filename} split into {total_chunks} chunks (chunk size: {chunk_size}).")
-
-        file_reviews = []
-        for idx, chunk in enumerate(chunks):
-            review = await review_chunk(file.filename, chunk, idx, total_chunks)
-            file_reviews.append(f"Chunk {idx+1}/{total_chunks} Review:\n{review}")
-
-        all_reviews.append({
-            "file_name": os.path.basename(file.filename),
-            "reviews": "\n\n".join(file_reviews)
-        })
-
-    if not all_reviews:
+    budget = SourceBudget()
+    source_skipped = []
+    sources = (
+        source
+        for file in files
+        for source in iter_upload_sources(file.filename, file.file, source_skipped, budget)
+    )
+    try:
+        jobs, skipped = await asyncio.to_thread(plan_review_jobs, sources)
+    except Exception as e:
+        logger.error(f"Error reading uploaded files: {e}")
+        raise HTTPException(status_code=400, detail=f"Error reading uploaded files: {e}")
+    skipped = source_skipped + skipped
+    if not jobs:
         raise HTTPException(status_code=400, detail="Hiçbir geçerli kod içeriği incelenemedi.")
 
-    return JSONResponse(content={"status": "success", "code_reviews": all_reviews})
+    all_reviews = [
+        {"file_name": result["file_name"], "reviews": result["review"]}
+        for result in await run_review_jobs(jobs)
+    ]
+    return JSONResponse(content={"status": "success", "code_reviews": all_reviews, "skipped": skipped})
 
 async def run_step(data: dict) -> dict:
     """
-    Execute code review process for given files
+    Execute code review process for given files or sources.
+    data["sources"]: (file_name, code) pairs, e.g. streamed from an uploaded archive or diff;
+    data["skipped"]: entries already filtered out while reading those sources.
+    data["files"]: file paths on disk (kept for pipeline compatibility).
+    Files are triaged statically first; reviews are returned ordered by risk.
     """
     try:
-        if not data.get("files"):
+        if data.get("sources") is not None:
+            sources = data["sources"]
+        elif data.get("files"):
+            sources = []
+            for file_path in data["files"]:
+                logger.info(f"Processing file: {file_path}")
+                try:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        sources.append((os.path.basename(file_path), f.read()))
+                except Exception as e:
+                    logger.error(f"Error processing file {file_path}: {str(e)}")
+                    raise HTTPException(status_code=500, detail=f"Error processing file {os.path.basename(file_path)}: {str(e)}")
+        else:
             raise HTTPException(status_code=400, detail="No files provided")
 
-        review_results = []
-        
-        for file_path in data["files"]:
-            logger.info(f"Processing file: {file_path}")
-            
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    code_content = f.read()
-
-                prompt = (
-                    "Please perform a detailed code review of the following code. "
-                    "Focus on:\n"
-                    "1. Potential bugs\n"
-                    "2. Code improvements\n"
-                    "3. Best practices\n"
-                    "4. Security concerns\n\n"
-                    f"Code to review:\n{code_content}"
-                )
-
-                response = chat(
-                    model="llama3.2",
-                    messages=[{"role": "user", "content": prompt}]
-                )
-
-                review_results.append({
-                    "file_name": os.path.basename(file_path),
-                    "review": response['message']['content']
-                })
-                
-                logger.info(f"Completed review for: {file_path}")
-
-            except Exception as e:
-                logger.error(f"Error processing file {file_path}: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Error processing file {os.path.basename(file_path)}: {str(e)}")
+        # Kaynaklar arşivden okunurken event loop bloklanmasın diye planlama ayrı thread'de yapılır
+        jobs, skipped = await asyncio.to_thread(plan_review_jobs, sources)
+        skipped = list(data.get("skipped") or []) + skipped
+        logger.info(f"Reviewing {len(jobs)} chunks, skipped {len(skipped)} files/chunks after triage")
+        review_results = await run_review_jobs(jobs, tenant=data.get("tenant"))
 
         return {
             "status": "success",
-            "reviews": review_results
+            "reviews": review_results,
+            "skipped": skipped
         }
 
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Invalid code review input: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Code review failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def create_standalone_app() -> FastAPI:
+    """
+    Adımı tek başına denemek için küçük bir FastAPI uygulaması oluşturur.
+    Sadece doğrudan çalıştırıldığında kullanılır; registry üzerinden yüklenen adım uygulama kurmaz.
+    """
+    standalone_app = FastAPI()
+    standalone_app.post("/api/processes/code_review/run")(process_code_review)
+    return standalone_app
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("code_review:app", host="127.0.0.1", port=8000, reload=True)
+    logging.basicConfig(level=logging.INFO)
+    uvicorn.run(create_standalone_app(), host="127.0.0.1", port=8000)
@@ -0,0 +1,116 @@
+"""
+registry.py
+-----------
+STLC adımlarının isim -> modül yolu olarak tanımlandığı kayıt (registry).
+Modüller ilk kullanımda import edilir; böylece sadece birkaç adıma hizmet eden
+worker'lar ollama, langchain gibi ağır bağımlılıkları hiç yüklemez.
+İstenirse warm_up() ile uygulama başlangıcında önceden yüklenebilir.
+"""
+
+import importlib
+import logging
+import time
+from collections.abc import Mapping
+
+logger = logging.getLogger("stlc.registry")
+
+# Adım adı -> modül yolu (import edilmeden önce sadece string olarak tutulur)
+STEP_MODULES = {
+    "codeReview": "stlc.code_review",
+    "requirementAnalysis": "stlc.requirement_analysis",
+    "testPlanning": "stlc.test_planning",
+    "testScenarioGeneration": "stlc.test_scenario_generation",
+    "testScenarioOptimization": "stlc.test_scenario_optimization",
+    "testCaseGeneration": "stlc.test_case_generation",
+    "testCaseOptimization": "stlc.test_case_optimization",
+    "testCodeGeneration": "stlc.test_code_generation",
+    "environmentSetup": "stlc.environment_setup",
+    "testExecution": "stlc.test_execution",
+    "testReporting": "stlc.test_reporting",
+    "testClosure": "stlc.test_closure",
+}
+
+# Frontend'in /api/processes/{process_type}/run ile gönderdiği süreç id'leri
+PROCESS_ALIASES = {
+    "code-review": "codeReview",
+}
+
+
+def load_step(step_name: str):
+    """
+    Adımın modülünü (ilk çağrıda import ederek) döndürür. Bilinmeyen adımlar için KeyError.
+    """
+    return importlib.import_module(STEP_MODULES[step_name])
+
+
+def get_handler(step_name: str):
+    """
+    Adımın run_step fonksiyonunu döndürür.
+    """
+    return load_step(step_name).run_step
+
+
+def warm_up(step_names=None) -> list:
+    """
+    Verilen adımları (None ise hepsini) önceden import eder; yüklenen adımları döndürür.
+    """
+    names = list(STEP_MODULES) if step_names is None else list(step_names)
+    loaded = []
+    for name in names:
+        if name not in STEP_MODULES:
+            logger.warning(f"Unknown STLC step in warm-up list: {name}")
+            continue
+        started = time.perf_counter()
+        load_step(name)
+        loaded.append(name)
+        logger.info(f"Warmed up step {name} in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return loaded
+
+
+def parse_warmup_spec(spec: str):
+    """
+    "" -> hiçbiri, "*" -> hepsi (None), "codeReview,testPlanning" -> liste.
+    """
+    spec = (spec or "").strip()
+    if not spec:
+        return []
+    if spec == "*":
+        return None
+    return [name.strip() for name in spec.split(",") if name.strip()]
+
+
+class LazyStepMap(Mapping):
+    """
+    Anahtarları adım adı (veya takma ad) olan, değerleri ilk erişimde yüklenen salt okunur sözlük.
+    Üyelik kontrolü (`in`) modülü import etmez.
+    """
+
+    def __init__(self, names: dict, resolve):
+        self._names = dict(names)
+        self._resolve = resolve
+
+    def __getitem__(self, key):
+        return self._resolve(self._names[key])
+
+    def __contains__(self, key):
+        return key in self._names
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+
+def module_map() -> LazyStepMap:
+    """
+    STLC_MODULE_MAP için: adım adı -> modül.
+    """
+    return LazyStepMap({name: name for name in STEP_MODULES}, load_step)
+
+
+def process_handler_map() -> LazyStepMap:
+    """
+    PROCESS_HANDLERS için: süreç id'si -> run_step fonksiyonu.
+    """
+    return LazyStepMap(PROCESS_ALIASES, get_handler)
@@ -2,7 +2,272 @@
 test_case_optimization.py
 -------------------------
 STLC'nin Test Case Optimization adımına ait işlemleri yönetir.
+
+LLM'in ürettiği test case'ler arasındaki (neredeyse) kopyaları bulur ve her grup için tek bir
+temsilci bırakır. İkili karşılaştırma yerine kelime shingle'ları üzerinde MinHash imzaları ve
+LSH (band) kovaları kullanılır; böylece on binlerce case yaklaşık doğrusal sürede işlenir.
+İsteğe bağlı olarak embedding'ler üzerinde SimHash kovaları ile anlamsal kopyalar da birleştirilir.
 """
 
+import logging
+import re
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+logger = logging.getLogger("test_case_optimization")
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 120
+LSH_BANDS = 20                      # 20 band x 6 satır: ~0.6 Jaccard üstü çiftler aday olur
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+JACCARD_THRESHOLD = 0.8
+EMBEDDING_THRESHOLD = 0.92
+SIMHASH_BITS = 16
+SIMHASH_TABLES = 4
+MINHASH_BATCH_SHINGLES = 32768      # bellek kullanımını sınırlamak için toplu işlem boyutu
+HASH_PRIME = np.uint64(4294967311)
+SEED = 1729
+
+TEXT_FIELDS_EXCLUDED = {"id", "priority", "status"}
+
+
+def case_id(case, index: int):
+    if isinstance(case, dict) and case.get("id") is not None:
+        return case["id"]
+    return index
+
+
+def case_text(case) -> str:
+    """
+    Case'in karşılaştırmada kullanılacak metni: dict ise id/öncelik dışındaki alanlar birleştirilir.
+    """
+    if isinstance(case, str):
+        return case
+    if isinstance(case, dict):
+        parts = []
+        for key, value in case.items():
+            if key in TEXT_FIELDS_EXCLUDED:
+                continue
+            if isinstance(value, (list, tuple)):
+                parts.extend(str(item) for item in value)
+            elif value is not None:
+                parts.append(str(value))
+        return "\n".join(parts)
+    return str(case)
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """
+    Normalize edilmiş metnin kelime k-gram (shingle) hash'leri (tekrarsız, uint64).
+    """
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signatures(shingle_sets: list) -> np.ndarray:
+    """
+    Tüm case'ler için (n, NUM_PERMUTATIONS) MinHash imza matrisi.
+    Case'ler toplu (batch) halde işlenir; her batch için permütasyonlar vektörel uygulanıp
+    np.minimum.reduceat ile case bazında minimum alınır.
+    """
+    rng = np.random.default_rng(SEED)
+    a = rng.integers(1, 2 ** 32, size=(NUM_PERMUTATIONS, 1), dtype=np.uint64)
+    b = rng.integers(0, 2 ** 32, size=(NUM_PERMUTATIONS, 1), dtype=np.uint64)
+
+    signatures = np.empty((len(shingle_sets), NUM_PERMUTATIONS), dtype=np.uint64)
+    start = 0
+    while start < len(shingle_sets):
+        end = start
+        total = 0
+        while end < len(shingle_sets) and (end == start or total + len(shingle_sets[end]) <= MINHASH_BATCH_SHINGLES):
+            total += len(shingle_sets[end])
+            end += 1
+        batch = shingle_sets[start:end]
+        offsets = np.cumsum([0] + [len(s) for s in batch[:-1]])
+        hashes = np.concatenate(batch)
+        permuted = (a * hashes[None, :] + b) % HASH_PRIME
+        signatures[start:end] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        start = end
+    return signatures
+
+
+class _DisjointSet:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, left: int, right: int):
+        left, right = self.find(left), self.find(right)
+        if left != right:
+            self.parent[max(left, right)] = min(left, right)
+
+
+def _bucket_runs(keys: np.ndarray):
+    """
+    Aynı anahtara sahip (aynı kovaya düşen) indeks gruplarını üretir; tekil kovalar atlanır.
+    """
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    boundaries = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(keys)]))
+    for run in np.flatnonzero(ends - starts > 1):
+        yield order[starts[run]:ends[run]]
+
+
+def _record_merge(merges: dict, item: int, partner: int, method: str, score: float):
+    """
+    Hangi geçişin (minhash/embedding) hangi çifti birleştirdiğini saklar. Her case için ilk
+    birleşme kaydı tutulur; lider olarak kalan case'ler için ters kayıt yedek olarak eklenir.
+    """
+    merges.setdefault(item, (partner, method, score))
+    merges.setdefault(partner, (item, method, score))
+
+
+def _merge_bucket(run, similarity, threshold: float, groups: _DisjointSet, merges: dict, method: str):
+    """
+    Kova içindeki case'leri "lider"lerle karşılaştırır: benzer olan lidere bağlanır, olmayan yeni lider olur.
+    Tam kopyalarla dolu büyük kovalarda karşılaştırma sayısı kova boyutuyla doğrusal kalır.
+    """
+    leaders = []
+    for item in run:
+        for leader in leaders:
+            if groups.find(item) == groups.find(leader):
+                break
+            score = similarity(item, leader)
+            if score >= threshold:
+                groups.union(item, leader)
+                _record_merge(merges, int(item), int(leader), method, score)
+                break
+        else:
+            leaders.append(item)
+
+
+def lsh_groups(signatures: np.ndarray, groups: _DisjointSet, merges: dict, threshold: float = JACCARD_THRESHOLD):
+    """
+    MinHash imzalarını band'lara böler; aynı band kovasına düşen ve tahmini Jaccard benzerliği
+    eşiği geçen case'leri birleştirir.
+    """
+    mixer = np.random.default_rng(SEED + 1).integers(1, 2 ** 63, size=LSH_ROWS, dtype=np.uint64)
+
+    def similarity(left, right):
+        return float(np.mean(signatures[left] == signatures[right]))
+
+    for band in range(LSH_BANDS):
+        rows = signatures[:, band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        keys = (rows * mixer).sum(axis=1)  # uint64 taşması kasıtlı: hızlı band hash'i
+        for run in _bucket_runs(keys):
+            _merge_bucket(run, similarity, threshold, groups, merges, "minhash")
+
+
+@lru_cache(maxsize=1)
+def _embedding_model():
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name="BAAI/bge-small-en")
+
+
+def embed_texts(texts: list) -> np.ndarray:
+    """
+    Varsayılan embedding fonksiyonu (HuggingFace modeli ilk kullanımda yüklenir ve tekrar kullanılır).
+    """
+    return np.asarray(_embedding_model().embed_documents(texts), dtype=np.float32)
+
+
+def embedding_groups(vectors: np.ndarray, groups: _DisjointSet, merges: dict, threshold: float = EMBEDDING_THRESHOLD):
+    """
+    Normalize edilmiş embedding'leri rastgele hiperdüzlemlerle (SimHash) kovalara ayırır ve
+    kova içinde kosinüs benzerliği eşiği geçen case'leri birleştirir.
+    """
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.where(norms == 0, 1, norms)
+    rng = np.random.default_rng(SEED + 2)
+    weights = (1 << np.arange(SIMHASH_BITS, dtype=np.uint64))
+
+    def similarity(left, right):
+        return float(unit[left] @ unit[right])
+
+    for _ in range(SIMHASH_TABLES):
+        planes = rng.standard_normal((unit.shape[1], SIMHASH_BITS)).astype(np.float32)
+        keys = ((unit @ planes) > 0).astype(np.uint64) @ weights
+        for run in _bucket_runs(keys):
+            _merge_bucket(run, similarity, threshold, groups, merges, "embedding")
+
+
+def optimize_test_cases(cases: list, threshold: float = JACCARD_THRESHOLD, embed_fn=None,
+                        embedding_threshold: float = EMBEDDING_THRESHOLD) -> dict:
+    """
+    cases: str veya dict test case listesi.
+    embed_fn: Verilirse (metin listesi -> vektör matrisi) embedding tabanlı kümeleme de uygulanır.
+    return: Temsilciler (orijinal sırada), birleştirilen gruplar ve sayılar. Her kopya için hangi
+    geçişin (minhash: tahmini Jaccard, embedding: kosinüs) hangi case ile eşleştirdiği raporlanır.
+    """
+    texts = [case_text(case) for case in cases]
+    shingle_sets = [shingle_hashes(text) for text in texts]
+    groups = _DisjointSet(len(cases))
+    merges = {}
+    if cases:
+        signatures = minhash_signatures(shingle_sets)
+        lsh_groups(signatures, groups, merges, threshold)
+        if embed_fn is not None:
+            embedding_groups(np.asarray(embed_fn(texts), dtype=np.float32), groups, merges, embedding_threshold)
+
+    members = {}
+    for index in range(len(cases)):
+        members.setdefault(groups.find(index), []).append(index)
+
+    kept = []
+    merged = []
+    for group in members.values():
+        # En ayrıntılı case (en çok shingle) temsilci olur; eşitlikte ilk gelen
+        representative = max(group, key=lambda i: (len(shingle_sets[i]), -i))
+        kept.append(representative)
+        if len(group) > 1:
+            merged.append({
+                "representative": case_id(cases[representative], representative),
+                "duplicates": [
+                    {
+                        "id": case_id(cases[i], i),
+                        "matched": case_id(cases[merges[i][0]], merges[i][0]),
+                        "method": merges[i][1],
+                        "similarity": round(merges[i][2], 3),
+                    }
+                    for i in group if i != representative
+                ],
+            })
+    kept.sort()
+    return {
+        "test_cases": [cases[i] for i in kept],
+        "merged": merged,
+        "original_count": len(cases),
+        "optimized_count": len(kept),
+    }
+
+
+def collect_test_cases(input_data) -> list:
+    if isinstance(input_data, list):
+        return input_data
+    input_data = input_data or {}
+    for key in ("test_cases", "result"):
+        if isinstance(input_data.get(key), list):
+            return input_data[key]
+    return []
+
+
 def run_step(input_data):
-    return {"step": "testCaseOptimization", "result": "Test case optimization completed."}
+    cases = collect_test_cases(input_data)
+    options = input_data if isinstance(input_data, dict) else {}
+    embed_fn = embed_texts if options.get("use_embeddings") else None
+    result = optimize_test_cases(cases, threshold=options.get("similarity_threshold", JACCARD_THRESHOLD), embed_fn=embed_fn)
+    logger.info(f"Test case optimization: {result['original_count']} -> {result['optimized_count']} cases")
+    return {"step": "testCaseOptimization", "result": result}
@@ -2,7 +2,58 @@
 test_closure.py
 ---------------
 STLC'nin Test Closure adımına ait işlemleri yönetir.
+
+Kapanış raporu, test sonuçları geçmişinin (core/results_store.py) özetlerinden üretilir ve
+çıkış kriterlerini (son koşunun başarı oranı, başarısız gereksinim olmaması) değerlendirir.
 """
 
+import logging
+import time
+
+from pymongo.errors import PyMongoError
+
+from core.results_store import normalize_requirement_ids, results_store
+
+logger = logging.getLogger("test_closure")
+
+DEFAULT_MIN_PASS_RATE = 0.95
+
+
+def build_closure_report(requirement_ids: list = None, min_pass_rate: float = DEFAULT_MIN_PASS_RATE) -> dict:
+    started = time.perf_counter()
+    totals = results_store.totals()
+    trend = results_store.pass_rate_trend(1)
+    latest_run = trend[-1] if trend else None
+    coverage = results_store.requirement_coverage(requirement_ids)
+    flaky_tests = results_store.flaky_tests()
+
+    unmet = []
+    if latest_run is None:
+        unmet.append("no test runs recorded")
+    elif latest_run["pass_rate"] < min_pass_rate:
+        unmet.append(f"latest run pass rate {latest_run['pass_rate']:.2%} is below {min_pass_rate:.2%}")
+    if coverage["summary"]["failing"]:
+        unmet.append(f"{coverage['summary']['failing']} requirement(s) have failing tests")
+    if coverage["summary"]["untested"]:
+        unmet.append(f"{coverage['summary']['untested']} requirement(s) have no test results")
+
+    return {
+        "totals": totals,
+        "latest_run": latest_run,
+        "requirement_coverage": coverage["summary"],
+        "open_requirements": [row for row in coverage["requirements"] if row["status"] != "passing"],
+        "flaky_tests": flaky_tests,
+        "exit_criteria": {"min_pass_rate": min_pass_rate, "met": not unmet, "unmet": unmet},
+        "generated_in_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
 def run_step(input_data):
-    return {"step": "testClosure", "result": "Test closure completed."}
+    options = input_data if isinstance(input_data, dict) else {}
+    try:
+        requirement_ids = normalize_requirement_ids(options.get("requirements"))
+        report = build_closure_report(requirement_ids, options.get("min_pass_rate", DEFAULT_MIN_PASS_RATE))
+    except PyMongoError as e:
+        logger.error(f"Test closure failed: {e}")
+        return {"step": "testClosure", "result": f"Test results history is unavailable: {e}"}
+    return {"step": "testClosure", "result": report}
@@ -2,7 +2,322 @@
 test_execution.py
 -----------------
 STLC'nin Test Execution adımına ait işlemleri yönetir.
+
+testCodeGeneration adımının ürettiği test kodu geçici bir sandbox dizinine yazılır, testler
+ast ile keşfedilir ve CPU çekirdeği sayısı kadar shard'a bölünür. Her shard, bellek ve süre
+sınırları uygulanmış ayrı bir alt süreçte (utils/sandbox_runner.py) çalışır; sonuçlar
+oluştukça olay (event) olarak akıtılır.
+
+Shard'lar geçmişte en yavaş olan testler önce başlayacak şekilde (LPT) dengelenir; test
+süreleri worker'lar arası ortak depoda (core/shared_store.py) tutulur. Sonuçlar ayrıca raporlama
+için test sonuçları geçmişine (core/results_store.py) kaydedilir.
+
+İzolasyonun kapsamı: alt süreç `python -I` ile, geçici bir çalışma dizininde, sadeleştirilmiş
+ortam değişkenleriyle ve bellek/CPU/süre sınırlarıyla çalışır. Dosya sistemi ve ağ erişimi
+KISITLANMAZ; kod, sunucu kullanıcısının yetkileriyle çalışır. Bu yüzden adım bir HTTP
+endpoint'inden doğrudan açılmaz, sadece pipeline içinden run_step ile çalıştırılır; güvenilmeyen
+kod için konteyner/VM gibi ek bir izolasyon katmanı gerekir.
 """
 
+import ast
+import heapq
+import json
+import logging
+import os
+import queue
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from config import TEST_EXECUTION_TIMEOUT, TEST_EXECUTION_MEMORY_MB, TEST_EXECUTION_WORKERS
+from core.results_store import ResultsStoreUnavailable, results_store
+from core.shared_store import shared_store
+from utils.system_info import available_cpus
+
+logger = logging.getLogger("test_execution")
+
+RUNNER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "utils", "sandbox_runner.py")
+DURATION_NAMESPACE = "test_durations"
+DEFAULT_TEST_FILE = "test_generated.py"
+WATCHDOG_MARGIN = 5.0
+
+
+def collect_test_files(input_data) -> dict:
+    """
+    Adım girdisinden {dosya_adı: kaynak_kod} sözlüğü oluşturur.
+    Desteklenen girdiler: "test_files" (sözlük), "test_code" (tek kaynak), "files" (dosya yolları)
+    veya testCodeGeneration çıktısındaki "result" metni.
+    """
+    input_data = input_data or {}
+    if isinstance(input_data, str):
+        return {DEFAULT_TEST_FILE: input_data}
+    if input_data.get("test_files"):
+        return dict(input_data["test_files"])
+    if input_data.get("test_code"):
+        return {DEFAULT_TEST_FILE: input_data["test_code"]}
+    if input_data.get("files"):
+        test_files = {}
+        for file_path in input_data["files"]:
+            with open(file_path, "r", encoding="utf-8") as f:
+                test_files[os.path.basename(file_path)] = f.read()
+        return test_files
+    if isinstance(input_data.get("result"), str):
+        return {DEFAULT_TEST_FILE: input_data["result"]}
+    return {}
+
+
+def _is_test_class(node: ast.ClassDef) -> bool:
+    base_names = {getattr(base, "attr", getattr(base, "id", "")) for base in node.bases}
+    return node.name.startswith("Test") or any(name.endswith("TestCase") for name in base_names)
+
+
+def discover_tests(test_files: dict) -> list:
+    """
+    Testleri import etmeden, ast ile keşfeder: "dosya::test" veya "dosya::Sınıf::test" id'leri.
+    Sözdizimi hatalı dosyalar "dosya::<collection>" olarak işaretlenir ve hata olarak raporlanır.
+    """
+    test_ids = []
+    for file_name, source in test_files.items():
+        try:
+            tree = ast.parse(source, filename=file_name)
+        except SyntaxError:
+            test_ids.append(f"{file_name}::<collection>")
+            continue
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test"):
+                test_ids.append(f"{file_name}::{node.name}")
+            elif isinstance(node, ast.ClassDef) and _is_test_class(node):
+                for item in node.body:
+                    if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name.startswith("test"):
+                        test_ids.append(f"{file_name}::{node.name}::{item.name}")
+    return test_ids
+
+
+def estimate_durations(test_ids: list) -> dict:
+    """
+    Geçmiş sürelerden tahmin üretir; geçmişi olmayan testler için bilinenlerin ortalaması kullanılır.
+    """
+    known = {}
+    for test_id in test_ids:
+        duration = shared_store.get(DURATION_NAMESPACE, test_id)
+        if duration is not None:
+            known[test_id] = duration
+    default = sum(known.values()) / len(known) if known else 1.0
+    return {test_id: known.get(test_id, default) for test_id in test_ids}
+
+
+def plan_shards(test_ids: list, shard_count: int, durations: dict) -> list:
+    """
+    En uzun işlem önce (LPT) dengeleme: testler tahmini süreye göre azalan sırada en az yüklü
+    shard'a atanır; her shard içinde de en yavaş testler önce çalışır.
+    """
+    shard_count = max(1, min(shard_count, len(test_ids)))
+    shards = [[] for _ in range(shard_count)]
+    loads = [(0.0, index) for index in range(shard_count)]
+    for test_id in sorted(test_ids, key=lambda t: -durations[t]):
+        load, index = heapq.heappop(loads)
+        shards[index].append(test_id)
+        heapq.heappush(loads, (load + durations[test_id], index))
+    return [shard for shard in shards if shard]
+
+
+def record_durations(events: list):
+    """
+    Tamamlanan testlerin sürelerini üstel hareketli ortalama ile ortak depoya yazar.
+    """
+    for event in events:
+        if event.get("event") != "result" or event["status"] not in ("passed", "failed", "timeout"):
+            continue
+        previous = shared_store.get(DURATION_NAMESPACE, event["test"])
+        duration = event["duration"] if previous is None else 0.7 * previous + 0.3 * event["duration"]
+        shared_store.set(DURATION_NAMESPACE, event["test"], round(duration, 4))
+
+
+def record_history(run_id: str, results: list, requirement_map: dict = None, started_at: float = None):
+    """
+    Sonuçları geçmiş deposuna yazar. Veritabanına ulaşılamaması test koşusunu başarısız yapmaz.
+    """
+    try:
+        results_store.record_results(run_id, results, requirement_map=requirement_map, started_at=started_at)
+    except ResultsStoreUnavailable:
+        logger.debug(f"Skipped recording results of run {run_id}: results store is backing off")
+    except Exception as e:
+        logger.warning(f"Could not record results of run {run_id}: {e}")
+
+
+def _kill_process_group(proc: subprocess.Popen):
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _run_shard(index: int, tests: list, sandbox_dir: str, timeout: float, memory_mb: int, events: queue.Queue):
+    """
+    Bir shard'ı izole alt süreçte çalıştırır ve olayları kuyruğa aktarır.
+    Süreç çökerse veya watchdog süresi aşılırsa, bitmemiş testler timeout/error olarak raporlanır.
+    """
+    deadline = timeout * len(tests) + WATCHDOG_MARGIN if timeout else None
+    env = {
+        "PATH": os.environ.get("PATH", ""),
+        "HOME": sandbox_dir,
+        "TMPDIR": sandbox_dir,
+        "PYTHONDONTWRITEBYTECODE": "1",
+        "PYTHONHASHSEED": "0",
+    }
+    # Yeni oturum: watchdog kill'i testlerin başlattığı alt süreçleri de kapsasın
+    popen_kwargs = {"start_new_session": True} if os.name == "posix" else {}
+    request = {
+        "tests": tests,
+        "timeout": timeout,
+        "memory_mb": memory_mb,
+        "cpu_seconds": int(deadline) + 1 if deadline else 0,
+    }
+
+    pending = list(tests)
+    running = None
+    proc = None
+    timed_out = threading.Event()
+    failure = None
+    try:
+        with open(os.path.join(sandbox_dir, f".shard-{index}.log"), "wb") as log:
+            proc = subprocess.Popen(
+                [sys.executable, "-I", RUNNER_PATH],
+                cwd=sandbox_dir, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=log,
+                text=True, **popen_kwargs
+            )
+
+            def on_deadline():
+                timed_out.set()
+                _kill_process_group(proc)
+
+            watchdog = threading.Timer(deadline, on_deadline) if deadline else None
+            if watchdog:
+                watchdog.start()
+            try:
+                proc.stdin.write(json.dumps(request))
+                proc.stdin.close()
+                for line in proc.stdout:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    if event.get("test") not in pending:
+                        continue
+                    if event["event"] == "start":
+                        running = event["test"]
+                        continue
+                    running = None
+                    pending.remove(event["test"])
+                    event["shard"] = index
+                    events.put(event)
+                proc.wait()
+            finally:
+                if watchdog:
+                    watchdog.cancel()
+    except Exception as e:
+        # Süreç başlatılamadı veya iletişim koptu (ör. BrokenPipe): kalan testler hata olarak raporlanır
+        failure = e
+        logger.error(f"Shard {index} failed: {e}")
+        if proc is not None:
+            _kill_process_group(proc)
+            proc.wait()
+    finally:
+        # Ana döngü shard_done olayını beklediği için bu blok her durumda çalışmalıdır
+        returncode = proc.returncode if proc is not None else None
+        cpu_limit_signal = getattr(signal, "SIGXCPU", None)
+        killed = timed_out.is_set() or (cpu_limit_signal is not None and returncode == -cpu_limit_signal)
+        for test_id in pending:
+            if failure is not None:
+                status, message = "error", f"shard failed: {failure}"
+            elif test_id == running:
+                status = "timeout" if killed else "error"
+                message = f"shard process exited with code {returncode} while running this test"
+            else:
+                status, message = "error", "not run: shard process exited early"
+            events.put({"event": "result", "test": test_id, "status": status, "duration": 0.0,
+                        "message": message, "shard": index})
+        events.put({"event": "shard_done", "shard": index, "returncode": returncode})
+
+
+def iter_execution_events(test_files: dict, timeout: float = TEST_EXECUTION_TIMEOUT,
+                          memory_mb: int = TEST_EXECUTION_MEMORY_MB, workers: int = TEST_EXECUTION_WORKERS,
+                          requirement_map: dict = None):
+    """
+    Testleri paralel shard'larda çalıştırır ve olayları oluştukça üretir (generator):
+    {"event": "plan"}, her test için {"event": "result", "status", "duration", ...} ve son olarak {"event": "summary"}.
+    requirement_map: Geçmişe kaydedilirken kullanılacak test_id -> [gereksinim id] eşlemesi.
+    """
+    run_id = uuid.uuid4().hex
+    started_at = time.time()
+    started = time.perf_counter()
+    test_files = {os.path.basename(file_name): source for file_name, source in test_files.items()}
+    test_ids = discover_tests(test_files)
+    durations = estimate_durations(test_ids)
+    shards = plan_shards(test_ids, workers or available_cpus(), durations) if test_ids else []
+    yield {"event": "plan", "run_id": run_id, "tests": len(test_ids), "shards": [len(shard) for shard in shards]}
+
+    counts = {}
+    results = []
+    with tempfile.TemporaryDirectory(prefix="stlc-sandbox-") as sandbox_dir:
+        for file_name, source in test_files.items():
+            with open(os.path.join(sandbox_dir, file_name), "w", encoding="utf-8") as f:
+                f.write(source)
+
+        events = queue.Queue()
+        threads = [
+            threading.Thread(target=_run_shard, args=(index, shard, sandbox_dir, timeout, memory_mb, events), daemon=True)
+            for index, shard in enumerate(shards)
+        ]
+        for thread in threads:
+            thread.start()
+
+        remaining = len(threads)
+        while remaining:
+            event = events.get()
+            if event["event"] == "shard_done":
+                remaining -= 1
+                continue
+            counts[event["status"]] = counts.get(event["status"], 0) + 1
+            results.append(event)
+            yield event
+        for thread in threads:
+            thread.join()
+
+    record_durations(results)
+    record_history(run_id, results, requirement_map, started_at)
+    cpu_time = sum(event["duration"] for event in results)
+    wall_time = time.perf_counter() - started
+    yield {
+        "event": "summary",
+        "run_id": run_id,
+        "total": len(results),
+        "counts": counts,
+        "wall_time": round(wall_time, 3),
+        "cpu_time": round(cpu_time, 3),
+        "shards": len(shards),
+    }
+
+
 def run_step(input_data):
-    return {"step": "testExecution", "result": "Test execution completed."}
+    test_files = collect_test_files(input_data)
+    if not test_files:
+        return {"step": "testExecution", "result": "No test code to execute.", "results": []}
+
+    results = []
+    summary = {}
+    requirement_map = input_data.get("requirement_map") if isinstance(input_data, dict) else None
+    for event in iter_execution_events(test_files, requirement_map=requirement_map):
+        if event["event"] == "result":
+            results.append(event)
+        elif event["event"] == "summary":
+            summary = event
+    logger.info(f"Executed {summary.get('total', 0)} tests: {summary.get('counts', {})}")
+    return {"step": "testExecution", "result": summary, "results": results}
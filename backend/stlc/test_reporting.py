@@ -2,7 +2,41 @@
 test_reporting.py
 -----------------
 STLC'nin Test Reporting adımına ait işlemleri yönetir.
+
+Rapor, test sonuçları geçmişindeki (core/results_store.py) önceden hesaplanmış özetlerden
+üretilir: son koşuların başarı trendi, kararsız (flaky) testler ve gereksinim kapsamı.
 """
 
+import logging
+import time
+
+from pymongo.errors import PyMongoError
+
+from config import RESULTS_TREND_RUNS
+from core.results_store import normalize_requirement_ids, results_store
+
+logger = logging.getLogger("test_reporting")
+
+
+def build_report(requirement_ids: list = None, trend_runs: int = RESULTS_TREND_RUNS) -> dict:
+    started = time.perf_counter()
+    trend = results_store.pass_rate_trend(trend_runs)
+    report = {
+        "latest_run": trend[-1] if trend else None,
+        "pass_rate_trend": trend,
+        "flaky_tests": results_store.flaky_tests(),
+        "requirement_coverage": results_store.requirement_coverage(requirement_ids),
+    }
+    report["generated_in_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return report
+
+
 def run_step(input_data):
-    return {"step": "testReporting", "result": "Test reporting completed."}
+    options = input_data if isinstance(input_data, dict) else {}
+    try:
+        requirement_ids = normalize_requirement_ids(options.get("requirements"))
+        report = build_report(requirement_ids, options.get("trend_runs", RESULTS_TREND_RUNS))
+    except PyMongoError as e:
+        logger.error(f"Test reporting failed: {e}")
+        return {"step": "testReporting", "result": f"Test results history is unavailable: {e}"}
+    return {"step": "testReporting", "result": report}
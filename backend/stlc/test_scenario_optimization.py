@@ -2,7 +2,194 @@
 test_scenario_optimization.py
 -----------------------------
 STLC'nin Test Scenario Optimization adımına ait işlemleri yönetir.
+
+Gereksinim -> senaryo kapsama matrisi, her senaryo için bir bitset (Python int) olarak kurulur.
+Tüm gereksinimleri kapsayan minimal senaryo alt kümesi, ağırlıklı açgözlü (greedy) set-cover ile
+seçilir: kritik gereksinimleri kapsayan senaryolar daha yüksek kazanç sağlar. Kazançlar yalnızca
+azalabildiği için "lazy greedy" (öncelik kuyruğunda bayat üst sınırlar) kullanılır; ardından
+seçim içinde başkaları tarafından tamamen kapsanan senaryolar elenir.
 """
 
+import heapq
+import logging
+import math
+
+logger = logging.getLogger("test_scenario_optimization")
+
+PRIORITY_WEIGHTS = {"critical": 10, "high": 5, "medium": 2, "low": 1}
+DEFAULT_PRIORITY = "medium"
+REQUIREMENT_KEYS = ("requirements", "covers", "requirement_ids")
+
+
+def _item_id(item, index: int):
+    if isinstance(item, dict):
+        return item.get("id", index)
+    return item
+
+
+def requirement_weight(requirement) -> int:
+    if not isinstance(requirement, dict):
+        return PRIORITY_WEIGHTS[DEFAULT_PRIORITY]
+    if requirement.get("critical"):
+        return PRIORITY_WEIGHTS["critical"]
+    priority = str(requirement.get("priority", DEFAULT_PRIORITY)).lower()
+    return PRIORITY_WEIGHTS.get(priority, PRIORITY_WEIGHTS[DEFAULT_PRIORITY])
+
+
+def scenario_requirements(scenario) -> list:
+    if isinstance(scenario, dict):
+        for key in REQUIREMENT_KEYS:
+            if scenario.get(key) is not None:
+                return list(scenario[key])
+    return []
+
+
+def build_coverage(requirements: list, scenarios: list):
+    """
+    return: (gereksinim id listesi, ağırlık katmanı -> bit maskesi, senaryo bitset listesi,
+             senaryo başına kapsanan gereksinim bit indeksleri)
+    Senaryoların referans verdiği ama listede olmayan gereksinimler varsayılan ağırlıkla eklenir.
+    """
+    requirement_ids = []
+    bit_of = {}
+    tiers = {}
+
+    def add(requirement_id, weight):
+        bit_of[requirement_id] = len(requirement_ids)
+        requirement_ids.append(requirement_id)
+        tiers[weight] = tiers.get(weight, 0) | (1 << bit_of[requirement_id])
+
+    for index, requirement in enumerate(requirements):
+        requirement_id = _item_id(requirement, index)
+        if requirement_id not in bit_of:
+            add(requirement_id, requirement_weight(requirement))
+
+    rows = []
+    members = []
+    for scenario in scenarios:
+        row = 0
+        bits = set()
+        for requirement_id in scenario_requirements(scenario):
+            if requirement_id not in bit_of:
+                add(requirement_id, PRIORITY_WEIGHTS[DEFAULT_PRIORITY])
+            bits.add(bit_of[requirement_id])
+            row |= 1 << bit_of[requirement_id]
+        rows.append(row)
+        members.append(sorted(bits))
+    return requirement_ids, tiers, rows, members
+
+
+def _gain(row: int, uncovered: int, tiers: dict) -> int:
+    newly = row & uncovered
+    if not newly:
+        return 0
+    return sum(weight * (newly & mask).bit_count() for weight, mask in tiers.items())
+
+
+def greedy_cover(rows: list, tiers: dict, costs: list = None) -> list:
+    """
+    Ağırlıklı greedy set-cover (lazy evaluation). Seçilen senaryo indekslerini seçim sırasıyla döndürür.
+    """
+    costs = costs or [1.0] * len(rows)
+    uncovered = 0
+    for row in rows:
+        uncovered |= row
+
+    heap = []
+    for index, row in enumerate(rows):
+        gain = _gain(row, uncovered, tiers)
+        if gain:
+            heap.append((-gain / costs[index], index))
+    heapq.heapify(heap)
+
+    selected = []
+    while uncovered and heap:
+        _, index = heapq.heappop(heap)
+        gain = _gain(rows[index], uncovered, tiers)
+        if not gain:
+            continue
+        ratio = gain / costs[index]
+        # Bayat üst sınır: güncel oran hâlâ kuyruktaki en iyi adaydan iyiyse seç, değilse geri koy
+        if heap and ratio < -heap[0][0]:
+            heapq.heappush(heap, (-ratio, index))
+            continue
+        selected.append(index)
+        uncovered &= ~rows[index]
+    return selected
+
+
+def prune_redundant(selected: list, members: list, requirement_count: int) -> list:
+    """
+    Kapsamı seçimdeki diğer senaryolarca tamamen karşılanan senaryoları, en son seçilenden
+    (en düşük marjinal katkı) başlayarak eler. Her gereksinimi kaç seçili senaryonun kapsadığı
+    sayılır; bir senaryo ancak kapsadığı tüm gereksinimlerin sayacı >= 2 ise çıkarılır.
+    Toplam maliyet seçili senaryoların kapsam boyutlarıyla doğrusaldır.
+    """
+    counts = [0] * requirement_count
+    for index in selected:
+        for bit in members[index]:
+            counts[bit] += 1
+
+    removed = set()
+    for index in reversed(selected):
+        if all(counts[bit] >= 2 for bit in members[index]):
+            removed.add(index)
+            for bit in members[index]:
+                counts[bit] -= 1
+    return [index for index in selected if index not in removed]
+
+
+def scenario_cost(scenario) -> float:
+    raw_cost = scenario.get("cost", 1.0) if isinstance(scenario, dict) else 1.0
+    try:
+        cost = float(raw_cost)
+    except (TypeError, ValueError):
+        cost = math.nan
+    if not math.isfinite(cost) or cost <= 0:
+        raise ValueError(f"Scenario {_item_id(scenario, '?')} has invalid cost {raw_cost!r}; costs must be positive")
+    return cost
+
+
+def optimize_scenarios(requirements: list, scenarios: list) -> dict:
+    costs = [scenario_cost(scenario) for scenario in scenarios]
+    requirement_ids, tiers, rows, members = build_coverage(requirements, scenarios)
+    selected = prune_redundant(greedy_cover(rows, tiers, costs), members, len(requirement_ids))
+    kept = sorted(selected)
+
+    covered = 0
+    for index in kept:
+        covered |= rows[index]
+    all_bits = (1 << len(requirement_ids)) - 1
+    uncovered_bits = all_bits & ~covered
+    critical_mask = tiers.get(PRIORITY_WEIGHTS["critical"], 0)
+    kept_set = set(kept)
+
+    return {
+        "scenarios": [scenarios[i] for i in kept],
+        "removed": [_item_id(scenarios[i], i) for i in range(len(scenarios)) if i not in kept_set],
+        "uncovered_requirements": [
+            requirement_ids[bit] for bit in range(len(requirement_ids)) if uncovered_bits >> bit & 1
+        ],
+        "coverage": {
+            "requirements": len(requirement_ids),
+            "covered": covered.bit_count(),
+            "critical": critical_mask.bit_count(),
+            "critical_covered": (covered & critical_mask).bit_count(),
+        },
+        "original_count": len(scenarios),
+        "optimized_count": len(kept),
+    }
+
+
 def run_step(input_data):
-    return {"step": "testScenarioOptimization", "result": "Test scenario optimization completed."}
+    input_data = input_data if isinstance(input_data, dict) else {}
+    scenarios = input_data.get("scenarios") or input_data.get("result") or []
+    if not isinstance(scenarios, list):
+        return {"step": "testScenarioOptimization", "result": "No scenarios to optimize."}
+    try:
+        result = optimize_scenarios(input_data.get("requirements") or [], scenarios)
+    except ValueError as e:
+        logger.error(f"Scenario optimization failed: {e}")
+        return {"step": "testScenarioOptimization", "result": f"Invalid scenario input: {e}"}
+    logger.info(f"Scenario optimization: {result['original_count']} -> {result['optimized_count']} scenarios")
+    return {"step": "testScenarioOptimization", "result": result}
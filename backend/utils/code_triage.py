@@ -0,0 +1,301 @@
+"""
+code_triage.py
+--------------
+Kod incelemesi (code review) öncesinde LLM'e gitmeden yerel olarak çalışan ucuz ön analiz.
+Python için `ast`, diğer diller için satır bazlı sezgisel kurallar kullanılır.
+
+- Üretilmiş (generated) ve dışarıdan alınmış (vendored) dosyaları atlar,
+- Sadece import veya sabit tanımı içeren chunk'ları atlar,
+- Statik bulguları (kullanılmayan isimler, bare except, gömülü gizli bilgiler) prompt'a ipucu olarak ekler,
+- Her chunk için bir risk skoru hesaplar; pahalı LLM çağrıları bu skora göre sıralanır.
+"""
+
+import ast
+import os
+import re
+import textwrap
+
+VENDORED_PATH_PARTS = {
+    "vendor", "vendored", "third_party", "thirdparty", "node_modules", "site-packages",
+    "bower_components", "dist", "build", ".venv", "venv", "__pycache__",
+}
+GENERATED_FILE_SUFFIXES = (
+    ".min.js", ".min.css", ".map", ".lock", "_pb2.py", "_pb2_grpc.py", ".pb.go", ".g.dart", ".designer.cs",
+)
+GENERATED_MARKERS = re.compile(
+    r"@generated|do not edit|auto-?generated|code generated by|generated by the protocol buffer compiler",
+    re.IGNORECASE,
+)
+GENERATED_SCAN_CHARS = 2048
+
+SECRET_NAME = re.compile(r"(passw(or)?d|secret|api_?key|access_?key|private_?key|auth_?token|token)", re.IGNORECASE)
+SECRET_ASSIGNMENT = re.compile(
+    r"""(?P<name>[\w.\-]*(passw(or)?d|secret|api[_\-]?key|access[_\-]?key|private[_\-]?key|token)[\w\-]*)["']?"""
+    r"""\s*[:=]\s*["'](?P<value>[^"'\s]{8,})["']""",
+    re.IGNORECASE,
+)
+SECRET_LITERALS = (
+    (re.compile(r"AKIA[0-9A-Z]{16}"), "AWS access key id"),
+    (re.compile(r"-----BEGIN (RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----"), "private key block"),
+    (re.compile(r"\bgh[pousr]_[A-Za-z0-9]{36,}\b"), "GitHub token"),
+)
+PLACEHOLDER_VALUES = re.compile(r"^(x+|\*+|changeme|example|dummy|placeholder|your[_\-].*|<.*>|\$\{.*\})$", re.IGNORECASE)
+EMPTY_CATCH = re.compile(r"catch\s*(\([^)]*\))?\s*\{\s*\}")
+BARE_EXCEPT_TEXT = re.compile(r"^\s*except\s*:", re.MULTILINE)
+
+# LLM incelemesinde öncelik verilmesi gereken riskli kalıplar
+RISKY_PATTERNS = (
+    (re.compile(r"\b(eval|exec)\s*\("), 3.0),
+    (re.compile(r"\b(os\.system|subprocess\.\w+|popen)\s*\(|shell\s*=\s*True"), 3.0),
+    (re.compile(r"\bpickle\.loads?\s*\(|\byaml\.load\s*\("), 2.5),
+    (re.compile(r"\b(SELECT|INSERT|UPDATE|DELETE)\b.*(\+|%s|\{|f[\"'])", re.IGNORECASE), 2.5),
+    (re.compile(r"\b(innerHTML|dangerouslySetInnerHTML|document\.write)\b"), 2.0),
+    (re.compile(r"\bverify\s*=\s*False\b|\bmd5\b|\bsha1\b", re.IGNORECASE), 1.5),
+)
+FINDING_WEIGHTS = {
+    "hardcoded_secret": 5.0,
+    "bare_except": 2.0,
+    "empty_catch": 2.0,
+    "unused_name": 0.5,
+}
+MAX_FINDINGS_PER_KIND = 2
+KIND_BASE_RISK = {"code": 1.0, "constants": 0.2, "imports": 0.1, "blank": 0.0}
+SKIPPED_KINDS = {"imports", "constants", "blank"}
+
+IMPORT_LINE = re.compile(
+    r"^\s*(import\s|from\s+\S+\s+import\s|#\s*include\b|using\s+[\w.]+\s*;|package\s+[\w.]+|"
+    r"(const|let|var)\s+\w+\s*=\s*require\(|require\s*\(|export\s+\*\s+from\s|@import\s)"
+)
+CONSTANT_LINE = re.compile(
+    r"^\s*((export\s+)?(const|final|static\s+final|public\s+static\s+final)\s+[\w<>\[\]]*\s*)?"
+    r"[A-Z][A-Z0-9_]*\s*(:\s*[\w\[\], ]+)?\s*=\s*[^=]"
+)
+COMMENT_LINE = re.compile(r"^\s*(#|//|/\*|\*|\*/|--|\"\"\"|''')")
+
+
+def is_python_file(file_name: str) -> bool:
+    return os.path.splitext(file_name)[1].lower() in (".py", ".pyw", ".pyi")
+
+
+def is_vendored_path(file_name: str) -> bool:
+    """
+    Dosya yolunun vendored/üçüncü parti veya build çıktısı dizininde olup olmadığını kontrol eder.
+    """
+    normalized = file_name.replace("\\", "/").lower()
+    parts = normalized.split("/")
+    if any(part in VENDORED_PATH_PARTS for part in parts[:-1]):
+        return True
+    return normalized.endswith(GENERATED_FILE_SUFFIXES)
+
+
+def is_generated_source(source: str) -> bool:
+    """
+    Dosyanın başındaki "@generated", "DO NOT EDIT" gibi işaretlere bakarak üretilmiş kod olup olmadığını belirler.
+    """
+    return bool(GENERATED_MARKERS.search(source[:GENERATED_SCAN_CHARS]))
+
+
+def _finding(kind: str, line: int, message: str, lines: list) -> dict:
+    snippet = lines[line - 1].strip() if 0 < line <= len(lines) else ""
+    return {"kind": kind, "line": line, "message": message, "snippet": snippet}
+
+
+def _is_placeholder(value: str) -> bool:
+    return len(value) < 8 or bool(PLACEHOLDER_VALUES.match(value))
+
+
+def _python_findings(tree: ast.AST, lines: list) -> list:
+    findings = []
+    imported = {}
+    loaded = set()
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name == "*":
+                    continue
+                name = (alias.asname or alias.name).split(".")[0]
+                imported.setdefault(name, node.lineno)
+        elif isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Store):
+            loaded.add(node.id)
+        elif isinstance(node, ast.ExceptHandler) and node.type is None:
+            findings.append(_finding("bare_except", node.lineno, "bare 'except:' catches SystemExit/KeyboardInterrupt", lines))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            value = node.value
+            if not (isinstance(value, ast.Constant) and isinstance(value.value, str)):
+                continue
+            for target in targets:
+                name = target.id if isinstance(target, ast.Name) else getattr(target, "attr", "")
+                if name and SECRET_NAME.search(name) and not _is_placeholder(value.value):
+                    findings.append(_finding("hardcoded_secret", node.lineno, f"possible hard-coded secret in '{name}'", lines))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            findings.extend(_unused_locals(node, lines))
+
+    # __all__ içinde dışa aktarılan isimler kullanılmış sayılır
+    exported = set(re.findall(r"[\"'](\w+)[\"']", "".join(l for l in lines if "__all__" in l)))
+    for name, lineno in imported.items():
+        if name not in loaded and name not in exported:
+            findings.append(_finding("unused_name", lineno, f"imported name '{name}' is never used", lines))
+    return findings
+
+
+def _unused_locals(func: ast.AST, lines: list) -> list:
+    stored = {}
+    loaded = set()
+    for node in ast.walk(func):
+        if isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Store):
+                stored.setdefault(node.id, node.lineno)
+            else:
+                loaded.add(node.id)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            loaded.update(node.names)
+    return [
+        _finding("unused_name", lineno, f"local variable '{name}' is assigned but never used", lines)
+        for name, lineno in stored.items()
+        if name not in loaded and not name.startswith("_")
+    ]
+
+
+def _text_findings(source: str, lines: list, python: bool) -> list:
+    findings = []
+    for lineno, line in enumerate(lines, start=1):
+        match = SECRET_ASSIGNMENT.search(line)
+        if match and not python and not _is_placeholder(match.group("value")):
+            findings.append(_finding("hardcoded_secret", lineno, f"possible hard-coded secret in '{match.group('name')}'", lines))
+        for pattern, label in SECRET_LITERALS:
+            if pattern.search(line):
+                findings.append(_finding("hardcoded_secret", lineno, f"{label} found in source", lines))
+        if not python and EMPTY_CATCH.search(line):
+            findings.append(_finding("empty_catch", lineno, "empty catch block swallows errors", lines))
+    if not python:
+        for match in BARE_EXCEPT_TEXT.finditer(source):
+            lineno = source.count("\n", 0, match.start()) + 1
+            findings.append(_finding("bare_except", lineno, "bare 'except:' catches SystemExit/KeyboardInterrupt", lines))
+    return findings
+
+
+def analyze_file(file_name: str, source: str) -> dict:
+    """
+    Dosya seviyesinde ön analiz yapar.
+    return: {"skip": bool, "reason": str, "findings": [...]}.
+    Python dosyaları ast ile, diğerleri regex tabanlı kurallarla incelenir.
+    """
+    if is_vendored_path(file_name):
+        return {"skip": True, "reason": "vendored", "findings": []}
+    if is_generated_source(source):
+        return {"skip": True, "reason": "generated", "findings": []}
+
+    lines = source.splitlines()
+    python = is_python_file(file_name)
+    findings = []
+    if python:
+        try:
+            findings.extend(_python_findings(ast.parse(source), lines))
+        except (SyntaxError, ValueError):
+            python = False
+    findings.extend(_text_findings(source, lines, python))
+    # İç içe fonksiyonlar hem kendi başına hem dış fonksiyonla birlikte taranır; tekrarları ayıkla
+    unique = {(f["kind"], f["line"], f["message"]): f for f in findings}
+    findings = sorted(unique.values(), key=lambda f: f["line"])
+    return {"skip": False, "reason": "", "findings": findings}
+
+
+def _is_constant_value(node: ast.AST) -> bool:
+    try:
+        ast.literal_eval(node)
+        return True
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return False
+
+
+def classify_chunk(file_name: str, chunk: str) -> str:
+    """
+    Chunk'ı "blank", "imports", "constants" veya "code" olarak sınıflandırır.
+    """
+    if not chunk.strip():
+        return "blank"
+
+    if is_python_file(file_name):
+        try:
+            tree = ast.parse(textwrap.dedent(chunk))
+        except (SyntaxError, ValueError):
+            tree = None
+        if tree is not None:
+            body = [
+                stmt for stmt in tree.body
+                if not (isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant))
+            ]
+            if not body:
+                return "blank"
+            if all(isinstance(stmt, (ast.Import, ast.ImportFrom)) for stmt in body):
+                return "imports"
+            if all(
+                isinstance(stmt, (ast.Import, ast.ImportFrom))
+                or (isinstance(stmt, (ast.Assign, ast.AnnAssign)) and stmt.value is not None
+                    and _is_constant_value(stmt.value))
+                for stmt in body
+            ):
+                return "constants"
+            return "code"
+
+    lines = [line for line in chunk.splitlines() if line.strip() and not COMMENT_LINE.match(line)]
+    if not lines:
+        return "blank"
+    if all(IMPORT_LINE.match(line) for line in lines):
+        return "imports"
+    if all(IMPORT_LINE.match(line) or CONSTANT_LINE.match(line) for line in lines):
+        return "constants"
+    return "code"
+
+
+def risk_score(kind: str, chunk: str, findings: list) -> float:
+    """
+    Chunk'ın risk skorunu hesaplar; yüksek skor daha önce incelenir.
+    """
+    score = KIND_BASE_RISK.get(kind, 1.0)
+    # Aynı türden çok sayıda önemsiz bulgu (ör. kullanılmayan isimler) riskli kalıpları geçmesin
+    counts = {}
+    for finding in findings:
+        counts[finding["kind"]] = counts.get(finding["kind"], 0) + 1
+    for finding_kind, count in counts.items():
+        score += min(count, MAX_FINDINGS_PER_KIND) * FINDING_WEIGHTS.get(finding_kind, 1.0)
+    for pattern, weight in RISKY_PATTERNS:
+        if pattern.search(chunk):
+            score += weight
+    # Uzun ve yoğun mantık içeren parçalar hafifçe öne alınır
+    score += min(chunk.count("\n"), 200) / 200
+    return round(score, 3)
+
+
+def triage_chunk(file_name: str, chunk: str, file_findings: list = None, line_range: tuple = None) -> dict:
+    """
+    Chunk için sınıf, atlanma kararı, risk skoru ve prompt'a eklenecek ipuçlarını döndürür.
+    file_findings: analyze_file'dan gelen bulgular.
+    line_range: Chunk'ın dosyadaki (ilk, son) satır numaraları; sadece bu aralıktaki bulgular ipucu
+    olarak eklenir. Verilmezse kaynak satırı chunk içinde geçen bulgular kullanılır.
+    """
+    kind = classify_chunk(file_name, chunk)
+    if line_range is not None:
+        first_line, last_line = line_range
+        findings = [f for f in (file_findings or []) if first_line <= f["line"] <= last_line]
+    else:
+        findings = [f for f in (file_findings or []) if f["snippet"] and f["snippet"] in chunk]
+    # Bulgu içeren chunk'lar (ör. sabitlerde gömülü bir parola) hiçbir zaman atlanmaz
+    skip = kind in SKIPPED_KINDS and not findings
+    return {
+        "kind": kind,
+        "skip": skip,
+        "risk": 0.0 if skip else risk_score(kind, chunk, findings),
+        "hints": [f"line {f['line']}: {f['message']}" for f in findings],
+    }
+
+
+def format_hints(hints: list) -> str:
+    """
+    Statik bulguları LLM prompt'una eklenecek metne dönüştürür.
+    """
+    if not hints:
+        return ""
+    return "Static analysis hints (verify, do not repeat blindly):\n" + "\n".join(f"- {h}" for h in hints) + "\n\n"
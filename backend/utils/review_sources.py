@@ -0,0 +1,307 @@
+"""
+review_sources.py
+-----------------
+Kod incelemesi için yüklenen dosyalardan (düz dosya, zip/tar arşivi veya unified diff)
+(dosya_adı, kaynak_kod) çiftleri üretir. Arşiv içerikleri diske açılmadan, giriş giriş
+okunur; tar arşivleri akış (stream) modunda işlenir.
+
+- Binary, vendored/üretilmiş dosya yolları okunmadan atlanır (utils/code_triage.py kuralları),
+- Diff'lerde sadece değişen hunk'lar (ve diff'in içerdiği bağlam satırları) incelemeye gider,
+- Dosya başına ve toplamda bayt sınırı uygulanır; bellek kullanımı sınırlı kalır.
+
+Atlanan girişler, çağıranın verdiği `skipped` listesine {"file_name", "reason"} olarak eklenir.
+"""
+
+import io
+import os
+import re
+import tarfile
+import zipfile
+
+from config import REVIEW_MAX_FILE_BYTES, REVIEW_MAX_TOTAL_BYTES
+from utils.code_triage import is_vendored_path
+
+BINARY_SUFFIXES = (
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp", ".pdf", ".zip", ".gz", ".tgz", ".bz2",
+    ".xz", ".7z", ".rar", ".jar", ".war", ".class", ".so", ".dll", ".dylib", ".exe", ".o", ".a",
+    ".pyc", ".pyo", ".whl", ".woff", ".woff2", ".ttf", ".otf", ".eot", ".mp3", ".mp4", ".mov",
+    ".avi", ".sqlite", ".sqlite3", ".db", ".bin", ".dat", ".npy", ".pkl", ".docx", ".xlsx", ".pptx",
+    ".odt", ".apk", ".aar", ".egg",
+)
+ARCHIVE_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+ZIP_SUFFIXES = (".zip",)
+DIFF_SUFFIXES = (".diff", ".patch")
+# Bu uzantılardaki yüklemeler içerik koklanmadan düz kaynak dosya kabul edilir
+SOURCE_SUFFIXES = (
+    ".py", ".pyw", ".pyi", ".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".vue", ".svelte", ".java",
+    ".kt", ".kts", ".scala", ".groovy", ".gradle", ".go", ".rs", ".c", ".h", ".cc", ".cpp", ".cxx",
+    ".hpp", ".hh", ".cs", ".vb", ".fs", ".rb", ".php", ".swift", ".m", ".mm", ".dart", ".lua", ".pl",
+    ".pm", ".r", ".ex", ".exs", ".erl", ".hs", ".clj", ".sh", ".bash", ".zsh", ".ps1", ".sql", ".html",
+    ".htm", ".css", ".scss", ".sass", ".less", ".json", ".yaml", ".yml", ".toml", ".ini", ".cfg",
+    ".xml", ".proto", ".tf", ".md", ".rst", ".txt",
+)
+ARCHIVE_MAGIC = (b"PK\x03\x04", b"PK\x05\x06", b"\x1f\x8b", b"BZh", b"\xfd7zXZ\x00")
+SNIFF_BYTES = 4096
+BINARY_SNIFF_BYTES = 8192
+
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,(\d+))? \+\d+(?:,(\d+))? @@")
+DIFF_MARKERS = re.compile(rb"^(diff --git |Index: |--- \S.*\n\+\+\+ )", re.MULTILINE)
+
+
+class SourceBudget:
+    """
+    Tek bir istekte okunabilecek toplam bayt miktarını takip eder.
+    """
+
+    def __init__(self, max_total_bytes: int = REVIEW_MAX_TOTAL_BYTES, max_file_bytes: int = REVIEW_MAX_FILE_BYTES):
+        self.remaining = max_total_bytes
+        self.max_file_bytes = max_file_bytes
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining <= 0
+
+    def consume(self, size: int) -> bool:
+        if size > self.remaining:
+            self.remaining = 0
+            return False
+        self.remaining -= size
+        return True
+
+
+def _normalize_path(path: str) -> str:
+    path = path.replace("\\", "/")
+    while path.startswith("./"):
+        path = path[2:]
+    return path
+
+
+def path_skip_reason(path: str):
+    """
+    İçerik okunmadan, sadece yola bakarak atlama nedeni belirler.
+    """
+    lower = path.lower()
+    if lower.endswith(BINARY_SUFFIXES):
+        return "binary"
+    if is_vendored_path(path):
+        return "vendored"
+    return None
+
+
+def decode_source(data: bytes):
+    """
+    UTF-8 metin ise çözer; NUL baytı içeren veya çözülemeyen içerik için None döner (binary).
+    """
+    if b"\0" in data[:BINARY_SNIFF_BYTES]:
+        return None
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def _read_entry(name: str, size: int, read, budget: SourceBudget, skipped: list):
+    """
+    Arşiv girişini filtrelerden geçirip okur; inceleme dışı kalırsa None döner.
+    read: En fazla verilen kadar bayt okuyan fonksiyon (sadece filtrelerden geçen girişler için çağrılır).
+    """
+    reason = path_skip_reason(name)
+    if reason is None and size > budget.max_file_bytes:
+        reason = "too_large"
+    if reason is None:
+        data = read(budget.max_file_bytes + 1)
+        if len(data) > budget.max_file_bytes:
+            reason = "too_large"
+        else:
+            source = decode_source(data)
+            if source is None:
+                reason = "binary"
+            elif not budget.consume(len(data)):
+                reason = "total_size_limit"
+            else:
+                return source
+    skipped.append({"file_name": name, "reason": reason})
+    return None
+
+
+def _member_reader(open_member):
+    def read(limit: int) -> bytes:
+        with open_member() as member:
+            return member.read(limit)
+    return read
+
+
+def iter_zip_sources(fileobj, budget: SourceBudget, skipped: list):
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            name = _normalize_path(info.filename)
+            read = _member_reader(lambda: archive.open(info))
+            source = _read_entry(name, info.file_size, read, budget, skipped)
+            if source is not None:
+                yield name, source
+            if budget.exhausted:
+                break
+
+
+def iter_tar_sources(fileobj, budget: SourceBudget, skipped: list):
+    # "r|*": sıkıştırma türü otomatik algılanır, arşiv geri sarılmadan tek geçişte okunur
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            name = _normalize_path(member.name)
+            read = _member_reader(lambda: archive.extractfile(member))
+            source = _read_entry(name, member.size, read, budget, skipped)
+            if source is not None:
+                yield name, source
+            if budget.exhausted:
+                break
+
+
+def _diff_path(header_line: str):
+    path = header_line[4:].rstrip("\r\n").split("\t")[0].strip()
+    if path == "/dev/null":
+        return None
+    if path.startswith(("a/", "b/")):
+        path = path[2:]
+    return path
+
+
+def iter_diff_sources(lines, budget: SourceBudget, skipped: list):
+    """
+    Unified diff'i satır satır işler ve her dosya için sadece hunk'larını (başlıklarıyla) üretir.
+    Hunk sonu, başlıktaki satır sayılarıyla belirlenir; böylece "--- " ile başlayan silinmiş
+    satırlar dosya başlığıyla karıştırılmaz. Silinen dosyalar incelenmez.
+    """
+    path = None
+    hunks = []
+    size = 0
+    reason = None
+    old_left = new_left = 0
+
+    def flush():
+        if path is None or (reason is None and not hunks):
+            return None
+        skip_reason = reason
+        if skip_reason is None and not budget.consume(size):
+            skip_reason = "total_size_limit"
+        if skip_reason is not None:
+            skipped.append({"file_name": path, "reason": skip_reason})
+            return None
+        return path, "".join(hunks)
+
+    for line in lines:
+        if old_left > 0 or new_left > 0:
+            marker = line[:1]
+            if marker in (" ", "-", "+", "\\"):
+                if marker != "+" and marker != "\\":
+                    old_left -= 1
+                if marker != "-" and marker != "\\":
+                    new_left -= 1
+                if path is not None and reason is None:
+                    size += len(line)
+                    if size > budget.max_file_bytes:
+                        reason, hunks = "too_large", []
+                    else:
+                        hunks.append(line)
+                continue
+            old_left = new_left = 0  # eksik hunk: başlık satırı olarak işlenmeye devam et
+
+        if line.startswith("diff --git ") or line.startswith("--- "):
+            if line.startswith("--- ") and path is None and not hunks:
+                continue
+            source = flush()
+            if source is not None:
+                yield source
+            if budget.exhausted:
+                return
+            path, hunks, size, reason = None, [], 0, None
+        elif line.startswith("+++ "):
+            path = _diff_path(line)
+            reason = path_skip_reason(path) if path is not None else None
+        elif line.startswith("Binary files "):
+            match = re.match(r"Binary files (?:a/)?(.+?) and (?:b/)?(.+?) differ", line)
+            if match:
+                skipped.append({"file_name": match.group(2), "reason": "binary"})
+        elif line.startswith("@@"):
+            match = HUNK_HEADER.match(line)
+            if match:
+                old_left = int(match.group(1) if match.group(1) is not None else 1)
+                new_left = int(match.group(2) if match.group(2) is not None else 1)
+                if path is not None and reason is None:
+                    size += len(line)
+                    hunks.append(line)
+
+    source = flush()
+    if source is not None:
+        yield source
+
+
+def detect_upload_kind(file_name: str, head: bytes) -> str:
+    """
+    Yüklenen dosyanın türünü ("zip", "tar", "diff", "binary" veya "file") belirler.
+    Arşivler sadece uzantılarıyla tanınır; içerik yalnızca tanınan bir kaynak uzantısı olmayan
+    dosyalarda diff olup olmadığını anlamak için koklanır. Uzantısı tanınmayan sıkıştırılmış
+    içerikler (ör. data.json.gz, .docx) arşiv olarak açılmaz, "binary" olarak atlanır.
+    """
+    lower = (file_name or "").lower()
+    if lower.endswith(DIFF_SUFFIXES):
+        return "diff"
+    if lower.endswith(ARCHIVE_SUFFIXES):
+        return "tar"
+    if lower.endswith(ZIP_SUFFIXES):
+        return "zip"
+    if lower.endswith(BINARY_SUFFIXES):
+        return "binary"
+    if lower.endswith(SOURCE_SUFFIXES):
+        return "file"
+    if head.startswith(ARCHIVE_MAGIC) or head[257:262] == b"ustar":
+        return "binary"
+    if DIFF_MARKERS.search(head):
+        return "diff"
+    return "file"
+
+
+def iter_upload_sources(file_name: str, fileobj, skipped: list, budget: SourceBudget = None):
+    """
+    Tek bir yüklemeden inceleme kaynaklarını üretir (generator).
+    fileobj: İkili (binary) ve geri sarılabilir dosya nesnesi (ör. UploadFile.file).
+    Bozuk arşivler için ValueError fırlatılır.
+    """
+    budget = budget or SourceBudget()
+    head = fileobj.read(SNIFF_BYTES)
+    fileobj.seek(0)
+    kind = detect_upload_kind(file_name, head)
+
+    try:
+        if kind == "zip":
+            yield from iter_zip_sources(fileobj, budget, skipped)
+            return
+        if kind == "tar":
+            yield from iter_tar_sources(fileobj, budget, skipped)
+            return
+    except (zipfile.BadZipFile, tarfile.TarError, EOFError) as e:
+        raise ValueError(f"Invalid archive {file_name}: {e}") from e
+
+    if kind == "binary":
+        skipped.append({"file_name": os.path.basename(file_name), "reason": "binary"})
+    elif kind == "diff":
+        text = io.TextIOWrapper(fileobj, encoding="utf-8", errors="replace", newline="")
+        skipped_before = len(skipped)
+        produced = False
+        try:
+            for source in iter_diff_sources(text, budget, skipped):
+                produced = True
+                yield source
+        finally:
+            text.detach()  # yüklenen dosyayı kapatmadan ayır
+        # Hiçbir şey üretmeyen ve atlama nedeni de bırakmayan diff sessizce kaybolmasın
+        if not produced and len(skipped) == skipped_before:
+            skipped.append({"file_name": os.path.basename(file_name), "reason": "no_hunks"})
+    else:
+        name = os.path.basename(file_name)
+        source = _read_entry(name, 0, fileobj.read, budget, skipped)
+        if source is not None:
+            yield name, source
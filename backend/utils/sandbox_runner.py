@@ -0,0 +1,158 @@
+"""
+sandbox_runner.py
+-----------------
+test_execution adımının izole alt süreçte çalıştırdığı shard çalıştırıcısı.
+Sadece standart kütüphaneyi kullanır ve `python -I sandbox_runner.py` olarak başlatılır.
+
+stdin'den {"tests": [...], "timeout": sn, "memory_mb": MB, "cpu_seconds": sn} okur, bellek/CPU
+sınırlarını (POSIX) kendine uygular, testleri verilen sırayla çalıştırır ve
+her test için stdout'a JSON satırları (start/result olayları) yazar. Testlerin kendi print
+çıktıları protokolü bozmasın diye stderr'e yönlendirilir.
+
+Desteklenen test biçimleri: modül seviyesindeki test_* fonksiyonları (async dahil),
+Test* sınıflarının test_* metotları (setup_method/teardown_method) ve unittest.TestCase.
+"""
+
+import asyncio
+import importlib.util
+import inspect
+import json
+import os
+import signal
+import sys
+import time
+import traceback
+import unittest
+
+
+class TestTimeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise TestTimeout()
+
+
+def _load_module(file_name: str, cache: dict):
+    if file_name not in cache:
+        module_name = os.path.splitext(os.path.basename(file_name))[0]
+        spec = importlib.util.spec_from_file_location(module_name, os.path.abspath(file_name))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+            cache[file_name] = (module, None)
+        except BaseException:
+            cache[file_name] = (None, traceback.format_exc(limit=5))
+    return cache[file_name]
+
+
+def _call(func):
+    if len([p for p in inspect.signature(func).parameters.values() if p.default is p.empty]):
+        raise TypeError("test requires fixtures, which the sandbox runner does not provide")
+    result = func()
+    if inspect.isawaitable(result):
+        asyncio.run(result)
+
+
+def _run_unittest(cls, method_name: str):
+    result = unittest.TestResult()
+    cls(method_name).run(result)
+    if result.skipped:
+        return "skipped", result.skipped[0][1]
+    if result.failures:
+        return "failed", result.failures[0][1]
+    if result.errors:
+        return "error", result.errors[0][1]
+    return "passed", ""
+
+
+def run_test(test_id: str, modules: dict):
+    file_name, *names = test_id.split("::")
+    module, import_error = _load_module(file_name, modules)
+    if module is None:
+        return "error", import_error
+
+    target = getattr(module, names[0])
+    if len(names) == 1:
+        _call(target)
+        return "passed", ""
+    if isinstance(target, type) and issubclass(target, unittest.TestCase):
+        return _run_unittest(target, names[1])
+
+    instance = target()
+    if hasattr(instance, "setup_method"):
+        instance.setup_method(getattr(instance, names[1]))
+    try:
+        _call(getattr(instance, names[1]))
+    finally:
+        if hasattr(instance, "teardown_method"):
+            instance.teardown_method(getattr(instance, names[1]))
+    return "passed", ""
+
+
+def limit_resources(memory_mb: int, cpu_seconds: int):
+    try:
+        import resource
+    except ImportError:  # Windows: sınırları sadece ebeveyndeki watchdog uygular
+        return
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpu_seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+
+
+def main():
+    request = json.loads(sys.stdin.read())
+    timeout = float(request.get("timeout") or 0)
+    limit_resources(request.get("memory_mb", 0), request.get("cpu_seconds", 0))
+    sys.path.insert(0, os.getcwd())
+
+    # Protokol için gerçek stdout'u sakla, test çıktılarını stderr'e yönlendir
+    protocol = os.fdopen(os.dup(1), "w", buffering=1)
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+
+    def emit(event: dict):
+        protocol.write(json.dumps(event) + "\n")
+
+    if timeout and hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _on_alarm)
+
+    modules = {}
+    for test_id in request["tests"]:
+        emit({"event": "start", "test": test_id})
+        started = time.perf_counter()
+        try:
+            if timeout and hasattr(signal, "setitimer"):
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+            try:
+                status, message = run_test(test_id, modules)
+            finally:
+                if timeout and hasattr(signal, "setitimer"):
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+        except TestTimeout:
+            status, message = "timeout", f"test exceeded {timeout:g}s"
+        except AssertionError:
+            status, message = "failed", traceback.format_exc(limit=5)
+        except unittest.SkipTest as e:
+            status, message = "skipped", str(e)
+        except BaseException as e:
+            if type(e).__name__ == "Skipped":  # pytest.skip()
+                status, message = "skipped", str(e)
+            elif isinstance(e, MemoryError):
+                status, message = "error", "memory limit exceeded"
+            else:
+                status, message = "error", traceback.format_exc(limit=5)
+        emit({
+            "event": "result",
+            "test": test_id,
+            "status": status,
+            "duration": round(time.perf_counter() - started, 4),
+            "message": message[-2000:],
+        })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""
+system_info.py
+--------------
+Sunucu başlatıcısı (server.py) ve STLC adımlarının ortak kullandığı sistem bilgisi yardımcıları.
+"""
+
+import os
+
+
+def available_cpus() -> int:
+    """
+    Sürecin çalışabileceği CPU sayısı (cgroup/affinity kısıtlarını dikkate alır).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
@@ -3,14 +3,94 @@ text_splitter.py
 ----------------
 Metinleri parçalara ayırma (chunking) işlemlerini içerir.
 Büyük dokümanların LLM için daha verimli hale getirilmesi amacıyla kullanılır.
+
+iter_text_chunks, metnin tamamını bellekte tutmadan (örneğin sayfa sayfa gelen
+PDF çıktısı gibi) parça parça gelen bir iterator üzerinde çalışır ve chunk'ları
+generator olarak üretir. Kesim noktaları sınırlı bir geriye bakış (lookback)
+penceresinde paragraf > cümle > kelime önceliğiyle aranır.
 """
 
+from typing import Iterable, Iterator
+
+# Öncelik sırasına göre kesim ayraçları: paragraf > cümle/satır > kelime
+BOUNDARY_SEPARATORS = (
+    ("\n\n",),
+    (". ", "! ", "? ", ".\n", "\n"),
+    (" ", "\t"),
+)
+
+
+def validate_chunk_params(chunk_size: int, overlap: int, lookback: int = 0):
+    """
+    Chunk parametrelerini doğrular. overlap >= chunk_size gibi ilerleme
+    sağlamayan (sonsuz döngüye yol açan) değerler için ValueError fırlatır.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    if overlap < 0 or lookback < 0:
+        raise ValueError("overlap and lookback must be non-negative")
+    if overlap + lookback >= chunk_size:
+        raise ValueError(
+            f"overlap + lookback ({overlap} + {lookback}) must be smaller than chunk_size ({chunk_size})"
+        )
+
+
+def _find_cut(buffer: str, start: int, chunk_size: int, lookback: int) -> int:
+    """
+    buffer[start:start + chunk_size] penceresinin son `lookback` karakteri içinde
+    en yüksek öncelikli ayracı arar ve kesim noktasını (ayraç dahil) döndürür.
+    Ayraç bulunamazsa sert kesim yapılır.
+    """
+    hard_end = start + chunk_size
+    if lookback:
+        window_start = hard_end - lookback
+        for separators in BOUNDARY_SEPARATORS:
+            best = -1
+            for sep in separators:
+                pos = buffer.rfind(sep, window_start, hard_end)
+                if pos != -1:
+                    best = max(best, pos + len(sep))
+            if best != -1:
+                return best
+    return hard_end
+
+
+def iter_text_chunks(pieces: Iterable[str], chunk_size: int = 1000, overlap: int = 100,
+                     lookback: int = 200) -> Iterator[str]:
+    """
+    pieces: Metin parçalarını üreten iterator (ör. sayfa bazlı çıkarım).
+    Her chunk en fazla chunk_size karakterdir; ardışık chunk'lar overlap karakter
+    örtüşür. lookback=0 verilirse sabit boyutlu sert kesim yapılır.
+
+    Tampon hiçbir zaman chunk_size + gelen parça boyutunu aşmaz; her karakter
+    sabit sayıda kopyalandığı için toplam maliyet metin uzunluğunda doğrusaldır.
+    """
+    validate_chunk_params(chunk_size, overlap, lookback)
+    if isinstance(pieces, str):
+        pieces = (pieces,)
+
+    buffer = ""
+    emitted = 0  # buffer içinde daha önce chunk olarak verilmiş kısmın sonu
+    for piece in pieces:
+        if not piece:
+            continue
+        buffer += piece
+        start = 0
+        while len(buffer) - start > chunk_size:
+            cut = _find_cut(buffer, start, chunk_size, lookback)
+            yield buffer[start:cut]
+            emitted = cut
+            start = cut - overlap
+        if start:
+            buffer = buffer[start:]
+            emitted -= start
+
+    if len(buffer) > emitted:
+        yield buffer
+
+
 def split_text_into_chunks(text: str, chunk_size: int = 1000, overlap: int = 100):
-    # Örnek bir basit mantık
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = min(start + chunk_size, len(text))
-        chunks.append(text[start:end])
-        start += chunk_size - overlap
-    return chunks
+    """
+    Geriye dönük uyumluluk için liste döndüren sabit boyutlu bölücü.
+    """
+    return list(iter_text_chunks([text], chunk_size=chunk_size, overlap=overlap, lookback=0))
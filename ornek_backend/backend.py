@@ -1,4 +1,5 @@
 import os
+import sys
 import logging
 import time
 from io import BytesIO
@@ -15,6 +16,7 @@ import docx
 # - RecursiveCharacterTextSplitter: Büyük metinleri parçalamak için kullanılır.
 # - HuggingFaceEmbeddings: Metinleri vektörleştirmek için HuggingFace tabanlı embedding modeli.
 # - Chroma: Vektör veritabanı, benzerlik araması için kullanılır.
+# HuggingFaceEmbeddings ve Chroma ağır bağımlılıklar olduğundan ilk kullanımda import edilir.
 from langchain.docstore.document import Document
 from langchain_community.chat_models import ChatOpenAI  
 from langchain.prompts.chat import (
@@ -23,13 +25,13 @@ from langchain.prompts.chat import (
     HumanMessagePromptTemplate
 )
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings  
-from langchain_community.vectorstores import Chroma
+from functools import lru_cache
 
 # LM Studio ve model ayarları
 LM_STUDIO_ENDPOINT = "http://192.168.88.100:1234/v1"
 MODEL_IDENTIFIER = "llama-3.2-3b-instruct" # modelleri çeşitlendirelim
 LLM_TOKEN_LIMIT = 4096  # LLM'in kabul edebileceği maksimum token sayısı
+EMBEDDING_MODEL_NAME = "BAAI/bge-small-en"
 
 # Logging yapılandırması: Uygulama genelinde hata ve bilgi mesajlarını loglamak için kullanılır.
 logging.basicConfig(level=logging.INFO)
@@ -150,6 +152,15 @@ def retry_invoke(chain, inputs, retries=3, timeout=10):
             time.sleep(1)  # Yeniden deneme öncesi kısa bekleme
     raise last_exception
 
+@lru_cache(maxsize=1)
+def get_embedding_model():
+    """
+    HuggingFace embedding modelini ilk çağrıda yükler ve süreç boyunca tekrar kullanır.
+    Kullanım amacı: Modeli her istekte yeniden yüklememek ve import maliyetini ilk kullanıma ertelemek.
+    """
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+
 @app.get("/models")
 def list_models():
     """
@@ -212,7 +223,8 @@ async def upload_documents(
     # Embedding model kullanımı:
     # HuggingFace tabanlı embedding modeli ile dokümanlar vektörleştirilir.
     # Bu sayede, belirli bir sorguya göre (örneğin test planı oluşturma) en uygun metin parçaları seçilebilir.
-    embedding_model = HuggingFaceEmbeddings(model_name="BAAI/bge-small-en")
+    from langchain_community.vectorstores import Chroma
+    embedding_model = get_embedding_model()
     vectorstore = Chroma.from_documents(docs, embedding_model, collection_name="uploaded_docs")
     
     # Sorgu ifadesi: Belirli bir test planı oluşturma isteğini temsil eder.
@@ -262,4 +274,13 @@ async def upload_documents(
     return JSONResponse(content={"result": result, "warning": warning_message})
 
 if __name__ == "__main__":
+    if os.getenv("STLC_ENV") == "production":
+        # Üretim modu: backend/server.py ile çok süreçli çalışır; embedding modeli fork öncesi
+        # master süreçte yüklenir ve worker'lar arasında copy-on-write olarak paylaşılır.
+        here = os.path.dirname(os.path.abspath(__file__))
+        server_path = os.path.join(here, "..", "backend", "server.py")
+        os.execv(sys.executable, [
+            sys.executable, server_path,
+            "--app-dir", here, "--app", "backend:app", "--preload", "backend:get_embedding_model"
+        ])
     uvicorn.run("backend:app", host="0.0.0.0", port=8000, reload=True)